@@ -0,0 +1,159 @@
+"""Synthetic corpora of files and syntax rules for benchmarks. They are deterministic for a given seed."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+SCOPES = (
+    "source.c++",
+    "source.css",
+    "source.dockerfile",
+    "source.go",
+    "source.ini",
+    "source.js",
+    "source.json",
+    "source.makefile",
+    "source.php",
+    "source.python",
+    "source.ruby",
+    "source.rust",
+    "source.shell.bash",
+    "source.sql",
+    "source.yaml",
+    "text.html.basic",
+    "text.xml",
+)
+"""Scopes of synthetic rules."""
+
+EXTENSIONS = {
+    "bash": "source.shell.bash",
+    "c": "source.c++",
+    "cpp": "source.c++",
+    "css": "source.css",
+    "go": "source.go",
+    "html": "text.html.basic",
+    "ini": "source.ini",
+    "js": "source.js",
+    "json": "source.json",
+    "php": "source.php",
+    "py": "source.python",
+    "python": "source.python",
+    "rb": "source.ruby",
+    "rs": "source.rust",
+    "sh": "source.shell.bash",
+    "sql": "source.sql",
+    "xml": "text.xml",
+    "yaml": "source.yaml",
+    "yml": "source.yaml",
+}
+"""Extensions (and interpreters) which the stub `sublime.find_syntax_for_file()` knows."""
+
+_SAMPLES = (
+    # (file names, first line, body lines)
+    (
+        ("main.py", "setup.py.dist", "manage", ".pythonrc"),
+        "#!/usr/bin/env python3",
+        ("import os", "from pathlib import Path", "def main() -> None:", "    print(Path.cwd())", "class Foo:"),
+    ),
+    (
+        ("build", ".bashrc", "install.sh.bak", "profile"),
+        "#!/bin/bash",
+        ("set -euo pipefail", 'echo "$HOME"', "for f in *; do", '  ls -la "$f"', "done"),
+    ),
+    (
+        (".eslintrc", "package.json.example", "a.geojson", "tsconfig.json-dev"),
+        "{",
+        ('  "name": "foo",', '  "version": "1.0.0",', '  "private": true,', '  "files": [],'),
+    ),
+    (
+        ("config.yml.dist", ".clang-format", "docker-compose.yaml.local", "mkdocs.yml"),
+        "---",
+        ("services:", "  web:", "    image: nginx", "    ports: ['80:80']", "key: value"),
+    ),
+    (
+        ("index", "functions.php.orig", "template.tpl"),
+        "<?php",
+        ("namespace App;", "use Foo\\Bar;", "function foo($bar) {", "    return $bar;", "}"),
+    ),
+    (
+        ("Makefile", "GNUmakefile.in", "rules.mk"),
+        ".PHONY: all",
+        ("all:", "\t$(CC) -o main main.c", "clean:", "\trm -f main"),
+    ),
+    (
+        ("README", "notes.txt", "LICENSE", "CHANGELOG"),
+        "Lorem ipsum dolor sit amet",
+        ("consectetur adipiscing elit", "sed do eiusmod tempor", "incididunt ut labore", ""),
+    ),
+)
+
+
+@dataclass
+class Corpus:
+    files: list[tuple[Path, str]]
+    """`(path, content)` of files, which are written on the disk."""
+    syntax_rules: list[dict[str, Any]]
+    """Synthetic syntax rules, which are used as `user_syntax_rules`."""
+
+
+def make_corpus(root: Path, *, files: int, rules: int, lines: int, seed: int) -> Corpus:
+    """Writes `files` synthetic files of about `lines` lines into `root` and makes `rules` synthetic rules."""
+    rnd = random.Random(seed)
+    corpus = Corpus(files=[], syntax_rules=[])
+
+    for directory in ("repo/.git", "repo/src/lib", "rails/config", "plain/a/b/c"):
+        (root / directory).mkdir(parents=True, exist_ok=True)
+    (root / "rails/config/routes.rb").touch()
+    directories = ("repo", "repo/src/lib", "rails", "plain/a/b/c")
+
+    for idx in range(files):
+        names, first_line, body = rnd.choice(_SAMPLES)
+        path = root / rnd.choice(directories) / f"{idx}" / rnd.choice(names)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = "\n".join((first_line, *(rnd.choice(body) for _ in range(max(0, lines - 1))))) + "\n"
+        path.write_text(content, encoding="utf-8")
+        corpus.files.append((path, content))
+
+    for idx in range(rules):
+        corpus.syntax_rules.append(_make_syntax_rule(rnd, idx))
+
+    return corpus
+
+
+def _make_syntax_rule(rnd: random.Random, idx: int) -> dict[str, Any]:
+    """Makes a rule which rarely matches, so that following rules are tested as well."""
+    specific_constraints: list[dict[str, Any]] = [
+        {"constraint": "is_extension", "args": [f".ext{idx}", f".ext{idx}.in"]},
+        {"constraint": "is_name", "args": [f"name{idx}", f".name{idx}rc"]},
+        {"constraint": "name_contains", "args": [f"part{idx}"]},
+        {"constraint": "path_contains", "args": [f"/dir{idx}/"]},
+        {"constraint": "first_line_contains", "args": [f"magic-{idx}"]},
+        {"constraint": "first_line_contains_regex", "args": [f"^#!.*\\btool{idx}\\b"]},
+        {"constraint": "contains", "args": [f"token_{idx}"]},
+        {"constraint": "contains_regex", "args": [f"^(?:def|fn)\\s+name{idx}\\b"], "kwargs": {"threshold": 2}},
+        {"constraint": "relative_exists", "args": [f"marker{idx}.cfg"]},
+    ]
+    broad_constraints: list[dict[str, Any]] = [
+        {"constraint": "is_in_git_repo"},
+        {"constraint": "is_in_ruby_on_rails_project"},
+        {"constraint": "is_line_count", "args": [">", 5]},
+        {"constraint": "contains", "args": ["import"], "inverted": True},
+    ]
+    if rnd.random() < 0.5:
+        return {
+            "comment": f"Synthetic rule #{idx}",
+            "syntaxes": f"scope:{rnd.choice(SCOPES)}",
+            "selector": "text.plain",
+            "match": "any",
+            "rules": rnd.sample(specific_constraints, rnd.randint(1, 3)),
+        }
+    return {
+        "comment": f"Synthetic rule #{idx}",
+        "syntaxes": f"scope:{rnd.choice(SCOPES)}",
+        "selector": "text.plain",
+        "match": "all",
+        "rules": [*rnd.sample(broad_constraints, rnd.randint(1, 2)), rnd.choice(specific_constraints)],
+    }
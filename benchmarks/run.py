@@ -0,0 +1,253 @@
+"""
+Benchmarks hot paths of the rule engine outside Sublime Text, with the stub `sublime` module in `stubs/`.
+
+Usage:
+
+    python benchmarks/run.py --output result.json
+    python benchmarks/run.py --compare baseline.json --threshold 0.2
+
+Results are written as JSON, which can be compared with a previous one. When comparing, the exit code is 1
+if any benchmark is slower than the baseline by more than the threshold ratio.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from collections.abc import Callable, Generator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCHMARKS_DIR.parent
+PACKAGE_NAME = "AutoSetSyntax"
+SCHEMA_VERSION = 1
+
+sys.path.insert(0, str(BENCHMARKS_DIR / "stubs"))
+sys.path.insert(0, str(BENCHMARKS_DIR))
+
+import sublime  # noqa: E402
+from corpus import EXTENSIONS, SCOPES, Corpus, make_corpus  # noqa: E402
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[], int]
+    """Runs the benchmark once and returns the amount of operations done."""
+    setup: Callable[[], Any] = lambda: None
+    """Runs before each `run()`, which is not timed."""
+
+
+def load_plugin(corpus: Corpus) -> types.ModuleType:
+    """Imports the plugin as the `AutoSetSyntax` package, with settings from the repository."""
+    for scope in SCOPES:
+        sublime.stub_add_syntax(scope, extensions=(ext for ext, ext_scope in EXTENSIONS.items() if ext_scope == scope))
+
+    settings = sublime.decode_value((REPO_DIR / f"{PACKAGE_NAME}.sublime-settings").read_text(encoding="utf-8"))
+    settings["enable_log"] = False
+    settings["user_syntax_rules"] = corpus.syntax_rules
+    # rules refer to syntaxes by scopes, which should all exist so that no rule is dropped
+    for scope in _iter_scopes(settings):
+        sublime.stub_add_syntax(scope)
+    sublime.load_settings(f"{PACKAGE_NAME}.sublime-settings").update(settings)
+
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = [str(REPO_DIR)]
+    sys.modules[PACKAGE_NAME] = package
+    plugin = importlib.import_module(f"{PACKAGE_NAME}.plugin")
+
+    sublime.Window()
+    plugin.plugin_loaded()
+    sublime.stub_run_timeouts()
+    return plugin
+
+
+def make_benchmarks(corpus: Corpus) -> list[Benchmark]:
+    from AutoSetSyntax.plugin.cache import clear_all_cached_functions  # type: ignore
+    from AutoSetSyntax.plugin.rules import SyntaxRuleCollection  # type: ignore
+    from AutoSetSyntax.plugin.settings import get_merged_plugin_setting, pref_syntax_rules  # type: ignore
+    from AutoSetSyntax.plugin.shared import G  # type: ignore
+    from AutoSetSyntax.plugin.snapshot import ViewSnapshot  # type: ignore
+    from AutoSetSyntax.plugin.utils import find_syntaxes_by_syntax_like, list_trimmed_strings  # type: ignore
+
+    window = sublime.active_window()
+    syntax_rules = pref_syntax_rules(window=window)
+    trim_suffixes = tuple(get_merged_plugin_setting("trim_suffixes", window=window))
+    views = [window.stub_open_view(content, str(path)) for path, content in corpus.files]
+    file_names = [path.name for path, _ in corpus.files]
+    syntax_likes = sorted({like for rule in syntax_rules for like in _as_list(rule.get("syntaxes"))})
+
+    state: dict[str, Any] = {}
+
+    def make_collection() -> int:
+        state["collection"] = SyntaxRuleCollection.make(syntax_rules)
+        return len(syntax_rules)
+
+    def optimize_collection() -> int:
+        collection = state["collection"]
+        list(collection.optimize())
+        collection.compile()
+        return len(syntax_rules)
+
+    def set_up_testing() -> None:
+        make_collection()
+        optimize_collection()
+        G.fs_probe_cache.clear()
+        G.project_marker_index.clear()
+        G.django_root_results.clear()
+        # reading views is measured by another benchmark
+        state["snapshots"] = snapshots = list(map(ViewSnapshot.from_view, views))
+        for snapshot in snapshots:
+            _ = (snapshot.content, snapshot.first_line, snapshot.file_path)
+
+    def test_collection() -> int:
+        collection = state["collection"]
+        for snapshot in state["snapshots"]:
+            collection.test(snapshot)
+        return len(views)
+
+    def take_snapshots() -> int:
+        for view in views:
+            snapshot = ViewSnapshot.from_view(view)
+            _ = (snapshot.content, snapshot.first_line, snapshot.file_name)
+        return len(views)
+
+    def trim_file_names() -> int:
+        for file_name in file_names:
+            list(list_trimmed_strings(file_name, trim_suffixes))
+        return len(file_names)
+
+    def find_syntaxes() -> int:
+        for like in syntax_likes:
+            find_syntaxes_by_syntax_like(like)
+        return len(syntax_likes)
+
+    return [
+        Benchmark("collection_make", make_collection, setup=clear_all_cached_functions),
+        Benchmark("collection_optimize", optimize_collection, setup=make_collection),
+        Benchmark("collection_test", test_collection, setup=set_up_testing),
+        Benchmark("view_snapshot", take_snapshots),
+        Benchmark("list_trimmed_strings", trim_file_names),
+        Benchmark("find_syntaxes_by_syntax_like", find_syntaxes, setup=clear_all_cached_functions),
+    ]
+
+
+def run_benchmark(benchmark: Benchmark, *, repeat: int) -> dict[str, Any]:
+    timings_ms: list[float] = []
+    ops = 0
+    for _ in range(repeat):
+        benchmark.setup()
+        started_at = time.perf_counter()
+        ops = benchmark.run()
+        timings_ms.append((time.perf_counter() - started_at) * 1000)
+
+    median_ms = statistics.median(timings_ms)
+    return {
+        "ops": ops,
+        "repeat": repeat,
+        "min_ms": round(min(timings_ms), 4),
+        "median_ms": round(median_ms, 4),
+        "mean_ms": round(statistics.fmean(timings_ms), 4),
+        "stdev_ms": round(statistics.stdev(timings_ms), 4) if repeat > 1 else 0.0,
+        "us_per_op": round(median_ms * 1000 / max(1, ops), 4),
+    }
+
+
+def compare_results(current: dict[str, Any], baseline: dict[str, Any], *, threshold: float) -> bool:
+    """Prints the comparison of medians. Returns `False` if any benchmark regresses more than `threshold`."""
+    is_ok = True
+    print(f"{'benchmark':<32} {'baseline (ms)':>14} {'current (ms)':>14} {'change':>9}")
+    for name, result in current["benchmarks"].items():
+        if not (base := baseline.get("benchmarks", {}).get(name)):
+            print(f"{name:<32} {'-':>14} {result['median_ms']:>14.3f} {'new':>9}")
+            continue
+        change = result["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        if is_regressed := change > threshold:
+            is_ok = False
+        print(
+            f"{name:<32} {base['median_ms']:>14.3f} {result['median_ms']:>14.3f} {change:>+9.1%}"
+            + (" REGRESSED" if is_regressed else "")
+        )
+    if baseline.get("meta", {}).get("corpus") != current["meta"]["corpus"]:
+        print("⚠️ Corpora are different, so results may not be comparable.")
+    return is_ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n\n")[0].strip())
+    parser.add_argument("--files", type=int, default=500, help="the amount of synthetic files")
+    parser.add_argument("--rules", type=int, default=200, help="the amount of synthetic syntax rules")
+    parser.add_argument("--lines", type=int, default=200, help="the amount of lines per synthetic file")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of synthetic corpora")
+    parser.add_argument("--repeat", type=int, default=5, help="how many times each benchmark runs")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose names contain this")
+    parser.add_argument("--output", type=Path, help="write results into this JSON file")
+    parser.add_argument("--compare", type=Path, help="compare results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="the max allowed slowdown ratio")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix=f"{PACKAGE_NAME}-benchmarks-") as tmp_dir:
+        corpus = make_corpus(Path(tmp_dir), files=args.files, rules=args.rules, lines=args.lines, seed=args.seed)
+        load_plugin(corpus)
+        results = {
+            "schema": SCHEMA_VERSION,
+            "meta": {
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "corpus": {"files": args.files, "rules": args.rules, "lines": args.lines, "seed": args.seed},
+            },
+            "benchmarks": {
+                benchmark.name: run_benchmark(benchmark, repeat=args.repeat)
+                for benchmark in make_benchmarks(corpus)
+                if args.filter in benchmark.name
+            },
+        }
+
+    content = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(content + "\n", encoding="utf-8")
+    else:
+        print(content)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        return 0 if compare_results(results, baseline, threshold=args.threshold) else 1
+    return 0
+
+
+def _as_list(value: Any) -> list[Any]:
+    return value if isinstance(value, list) else [value] if value else []
+
+
+def _iter_scopes(obj: Any) -> Generator[str, None, None]:
+    """Yields scopes of all `"scope:..."` strings in `obj`, recursively."""
+    if isinstance(obj, str) and obj.startswith("scope:"):
+        yield obj[6:]
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from _iter_scopes(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from _iter_scopes(value)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(("git", "rev-parse", "HEAD"), cwd=REPO_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,450 @@
+"""
+A minimal in-memory `sublime` module, which is just enough for running the plugin outside Sublime Text.
+
+It's only used by benchmarks. Functions which are not a part of the real API are prefixed with `stub_`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+from collections.abc import Callable, Iterable
+from itertools import count
+from typing import Any
+
+_STORAGE_DIR = tempfile.mkdtemp(prefix="sublime-stub-")
+_ids = count(1)
+_timeouts: list[Callable[[], Any]] = []
+
+
+def arch() -> str:
+    return "x64"
+
+
+def channel() -> str:
+    return "stable"
+
+
+def platform() -> str:
+    return "linux"
+
+
+def version() -> str:
+    return "4180"
+
+
+def cache_path() -> str:
+    return os.path.join(_STORAGE_DIR, "Cache")
+
+
+def packages_path() -> str:
+    return os.path.join(_STORAGE_DIR, "Packages")
+
+
+def installed_packages_path() -> str:
+    return os.path.join(_STORAGE_DIR, "Installed Packages")
+
+
+def executable_path() -> str:
+    return os.path.join(_STORAGE_DIR, "sublime_text")
+
+
+def status_message(msg: str) -> None:
+    pass
+
+
+def message_dialog(msg: str) -> None:
+    pass
+
+
+def error_message(msg: str) -> None:
+    pass
+
+
+def set_clipboard(text: str) -> None:
+    pass
+
+
+def expand_variables(value: Any, variables: dict[str, str]) -> Any:
+    return value
+
+
+def load_resource(name: str) -> str:
+    raise FileNotFoundError(name)
+
+
+def decode_value(data: str) -> Any:
+    """Decodes a JSON string which may have comments and trailing commas, like `.sublime-settings`."""
+    data = re.sub(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', lambda m: m.group(1) or "", data, flags=re.DOTALL)
+    return json.loads(re.sub(r'("(?:\\.|[^"\\])*")|,(\s*[\]}])', lambda m: m.group(1) or m.group(2), data))
+
+
+def set_timeout(callback: Callable[[], Any], delay: int = 0) -> None:
+    _timeouts.append(callback)
+
+
+def set_timeout_async(callback: Callable[[], Any], delay: int = 0) -> None:
+    _timeouts.append(callback)
+
+
+def stub_run_timeouts() -> None:
+    """Runs scheduled callbacks, including those which are scheduled by them, immediately."""
+    while _timeouts:
+        _timeouts.pop(0)()
+
+
+# ------- #
+# Syntax  #
+# ------- #
+
+
+class Syntax:
+    def __init__(self, path: str, name: str, hidden: bool, scope: str) -> None:
+        self.path = path
+        self.name = name
+        self.hidden = hidden
+        self.scope = scope
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Syntax) and self.path == other.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __repr__(self) -> str:
+        return f"Syntax({self.path!r}, {self.name!r}, {self.hidden!r}, {self.scope!r})"
+
+
+_syntaxes: list[Syntax] = [Syntax("Packages/Text/Plain text.tmLanguage", "Plain Text", False, "text.plain")]
+_extensions: dict[str, Syntax] = {}
+
+
+def stub_add_syntax(scope: str, name: str = "", extensions: Iterable[str] = ()) -> Syntax:
+    """Adds a syntax for `scope`, which is used by `find_syntax_for_file()` for `extensions`."""
+    if not (syntax := next((syntax for syntax in _syntaxes if syntax.scope == scope), None)):
+        name = name or scope.rpartition(".")[2].title()
+        syntax = Syntax(f"Packages/{name}/{name}.sublime-syntax", name, False, scope)
+        _syntaxes.append(syntax)
+    for extension in extensions:
+        _extensions[extension] = syntax
+    return syntax
+
+
+def list_syntaxes() -> list[Syntax]:
+    return list(_syntaxes)
+
+
+def syntax_from_path(path: str) -> Syntax | None:
+    return next((syntax for syntax in _syntaxes if syntax.path == path), None)
+
+
+def find_syntax_by_name(name: str) -> list[Syntax]:
+    return [syntax for syntax in _syntaxes if syntax.name == name]
+
+
+def find_syntax_by_scope(scope: str) -> list[Syntax]:
+    return [syntax for syntax in _syntaxes if syntax.scope == scope]
+
+
+def find_syntax_for_file(path: str, first_line: str = "") -> Syntax | None:
+    if first_line.startswith("#!") and (interpreter := re.search(r"(\w+)\s*$", first_line)):
+        if syntax := _extensions.get(interpreter.group(1)):
+            return syntax
+    name = os.path.basename(path)
+    return _extensions.get(name) or _extensions.get(name.rpartition(".")[2] if "." in name else "") or _syntaxes[0]
+
+
+def score_selector(scope_name: str, selector: str) -> int:
+    """A simplified scoring: only comma-separated selectors of scope prefixes are supported."""
+    best = 0
+    for alternative in (selector or "").split(","):
+        if not (alternative := alternative.strip()):
+            return 1
+        scopes = scope_name.split()
+        if any(scope == alternative or scope.startswith(f"{alternative}.") for scope in scopes):
+            best = max(best, alternative.count(".") + 1)
+    return best
+
+
+# -------- #
+# Settings #
+# -------- #
+
+
+class Settings:
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        self._data = dict(data or {})
+        self._callbacks: dict[str, Callable[[], Any]] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def has(self, key: str) -> bool:
+        return key in self._data
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = value
+
+    def erase(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def update(self, data: dict[str, Any]) -> None:
+        self._data.update(data)
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(self._data)
+
+    def add_on_change(self, tag: str, callback: Callable[[], Any]) -> None:
+        self._callbacks[tag] = callback
+
+    def clear_on_change(self, tag: str) -> None:
+        self._callbacks.pop(tag, None)
+
+    def stub_notify_change(self) -> None:
+        for callback in tuple(self._callbacks.values()):
+            callback()
+
+
+_settings: dict[str, Settings] = {}
+
+
+def load_settings(base_name: str) -> Settings:
+    return _settings.setdefault(base_name, Settings())
+
+
+# ---- #
+# View #
+# ---- #
+
+
+class Region:
+    def __init__(self, a: int, b: int | None = None) -> None:
+        self.a = a
+        self.b = a if b is None else b
+
+    def begin(self) -> int:
+        return min(self.a, self.b)
+
+    def end(self) -> int:
+        return max(self.a, self.b)
+
+    def size(self) -> int:
+        return abs(self.b - self.a)
+
+    def to_tuple(self) -> tuple[int, int]:
+        return (self.a, self.b)
+
+
+class Selection(list):
+    pass
+
+
+class Sheet:
+    def is_transient(self) -> bool:
+        return False
+
+
+class Edit:
+    pass
+
+
+class TextChange:
+    def __init__(self, text: str = "") -> None:
+        self.str = text
+
+
+class Buffer:
+    def __init__(self, view: View) -> None:
+        self.buffer_id = next(_ids)
+        self._views = [view]
+
+    def id(self) -> int:
+        return self.buffer_id
+
+    def views(self) -> list[View]:
+        return list(self._views)
+
+    def primary_view(self) -> View:
+        return self._views[0]
+
+
+class View:
+    def __init__(self, window: Window | None = None, text: str = "", file_name: str | None = None) -> None:
+        self.view_id = next(_ids)
+        self._window = window
+        self._text = text
+        self._file_name = file_name
+        self._syntax = _syntaxes[0]
+        self._settings = Settings()
+        self._buffer = Buffer(self)
+        self._selection = Selection([Region(0)])
+        self._change_count = 0
+        self._is_dirty = False
+        self._is_valid = True
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, View) and self.view_id == other.view_id
+
+    def __hash__(self) -> int:
+        return self.view_id
+
+    def __repr__(self) -> str:
+        return f"View({self.view_id!r})"
+
+    def id(self) -> int:
+        return self.view_id
+
+    def buffer_id(self) -> int:
+        return self._buffer.id()
+
+    def buffer(self) -> Buffer:
+        return self._buffer
+
+    def is_valid(self) -> bool:
+        return self._is_valid
+
+    def window(self) -> Window | None:
+        return self._window
+
+    def sheet(self) -> Sheet:
+        return Sheet()
+
+    def element(self) -> str | None:
+        return None
+
+    def file_name(self) -> str | None:
+        return self._file_name
+
+    def name(self) -> str:
+        return ""
+
+    def set_name(self, name: str) -> None:
+        pass
+
+    def size(self) -> int:
+        return len(self._text)
+
+    def substr(self, x: Region | int) -> str:
+        if isinstance(x, int):
+            return self._text[x : x + 1]
+        return self._text[x.begin() : x.end()]
+
+    def line(self, x: Region | int) -> Region:
+        point = x if isinstance(x, int) else x.begin()
+        begin = self._text.rfind("\n", 0, point) + 1
+        end = len(self._text) if (end := self._text.find("\n", point)) == -1 else end
+        return Region(begin, end)
+
+    def full_line(self, x: Region | int) -> Region:
+        region = self.line(x)
+        return Region(region.a, min(region.b + 1, len(self._text)))
+
+    def rowcol(self, point: int) -> tuple[int, int]:
+        row = self._text.count("\n", 0, point)
+        return (row, point - (self._text.rfind("\n", 0, point) + 1))
+
+    def sel(self) -> Selection:
+        return self._selection
+
+    def syntax(self) -> Syntax | None:
+        return self._syntax
+
+    def assign_syntax(self, syntax: Syntax | str) -> None:
+        self._syntax = syntax if isinstance(syntax, Syntax) else (syntax_from_path(syntax) or _syntaxes[0])
+
+    def settings(self) -> Settings:
+        return self._settings
+
+    def change_count(self) -> int:
+        return self._change_count
+
+    def is_dirty(self) -> bool:
+        return self._is_dirty
+
+    def is_loading(self) -> bool:
+        return False
+
+    def is_read_only(self) -> bool:
+        return False
+
+    def set_read_only(self, read_only: bool) -> None:
+        pass
+
+    def set_scratch(self, scratch: bool) -> None:
+        pass
+
+    def encoding(self) -> str:
+        return "UTF-8"
+
+    def line_endings(self) -> str:
+        return "Unix"
+
+    def clear_undo_stack(self) -> None:
+        pass
+
+    def run_command(self, cmd: str, args: dict[str, Any] | None = None) -> None:
+        pass
+
+
+class Window:
+    def __init__(self) -> None:
+        self.window_id = next(_ids)
+        self._views: list[View] = []
+        self._panels: dict[str, View] = {}
+        _windows.append(self)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Window) and self.window_id == other.window_id
+
+    def __hash__(self) -> int:
+        return self.window_id
+
+    def id(self) -> int:
+        return self.window_id
+
+    def is_valid(self) -> bool:
+        return True
+
+    def project_data(self) -> dict[str, Any] | None:
+        return None
+
+    def views(self, *, include_transient: bool = False) -> list[View]:
+        return list(self._views)
+
+    def new_file(self) -> View:
+        return self.stub_open_view()
+
+    def stub_open_view(self, text: str = "", file_name: str | None = None) -> View:
+        """Opens a clean view with `text`, which is the content of the file `file_name` if any."""
+        view = View(self, text, file_name)
+        self._views.append(view)
+        return view
+
+    def find_output_panel(self, name: str) -> View | None:
+        return self._panels.get(name)
+
+    def create_output_panel(self, name: str, unlisted: bool = False) -> View:
+        panel = self._panels[name] = View(self)
+        return panel
+
+    def destroy_output_panel(self, name: str) -> None:
+        self._panels.pop(name, None)
+
+    def active_panel(self) -> str | None:
+        return None
+
+    def run_command(self, cmd: str, args: dict[str, Any] | None = None) -> None:
+        pass
+
+
+_windows: list[Window] = []
+
+
+def windows() -> list[Window]:
+    return list(_windows)
+
+
+def active_window() -> Window:
+    return _windows[0] if _windows else Window()
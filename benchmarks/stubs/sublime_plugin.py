@@ -0,0 +1,44 @@
+"""A minimal `sublime_plugin` module for benchmarks. See `sublime.py` for details."""
+
+from __future__ import annotations
+
+import sublime
+
+
+class Command:
+    def is_enabled(self) -> bool:
+        return True
+
+    def is_visible(self) -> bool:
+        return True
+
+    def description(self) -> str:
+        return ""
+
+
+class ApplicationCommand(Command):
+    pass
+
+
+class WindowCommand(Command):
+    def __init__(self, window: sublime.Window) -> None:
+        self.window = window
+
+
+class TextCommand(Command):
+    def __init__(self, view: sublime.View) -> None:
+        self.view = view
+
+
+class EventListener:
+    pass
+
+
+class ViewEventListener:
+    def __init__(self, view: sublime.View) -> None:
+        self.view = view
+
+
+class TextChangeListener:
+    def __init__(self) -> None:
+        self.buffer: sublime.Buffer | None = None
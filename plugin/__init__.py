@@ -13,7 +13,8 @@ from .commands import (
     AutoSetSyntaxCreateNewMatchCommand,
     AutoSetSyntaxDebugInformationCommand,
     AutoSetSyntaxDownloadDependenciesCommand,
-    run_auto_set_syntax_on_view,
+    AutoSetSyntaxProfileReportCommand,
+    run_auto_set_syntax_on_startup_views,
 )
 from .constants import PLUGIN_CUSTOM_MODULE_PATHS, PLUGIN_NAME, PLUGIN_PY_LIBS_DIR
 from .listener import (
@@ -29,11 +30,19 @@ from .logger import (
     AutoSetSyntaxToggleLogPanelCommand,
     AutoSetSyntaxUpdateLogCommand,
 )
-from .rules import AbstractConstraint, AbstractMatch, MatchableRule
+from .magika_session import MagikaSubprocessSession
+from .rules import (
+    AbstractConstraint,
+    AbstractMatch,
+    ConstraintRule,
+    MatchableRule,
+    MatchRule,
+    SyntaxRule,
+    get_constraints,
+)
 from .settings import AioSettings, extra_settings_producer, get_merged_plugin_setting
 from .shared import G
 from .snapshot import ViewSnapshot
-from .types import ListenerEvent
 
 __all__ = (
     # ST: core
@@ -50,6 +59,7 @@ __all__ = (
     "AutoSetSyntaxCreateNewMatchCommand",
     "AutoSetSyntaxDebugInformationCommand",
     "AutoSetSyntaxDownloadDependenciesCommand",
+    "AutoSetSyntaxProfileReportCommand",
     # ST: listeners
     "AioSettings",
     "AutoSetSyntaxEventListener",
@@ -79,11 +89,25 @@ def _plugin_loaded() -> None:
     for window in sublime.windows():
         set_up_window(window)
 
+    _set_up_fs_probe_cache()
+    _set_up_magika_prediction_cache()
+    _set_up_magika_session()
+    _set_up_rule_profiler()
+
     if get_merged_plugin_setting("run_on_startup_views"):
+        G.persistent_decision_cache.maxsize = get_merged_plugin_setting("persistent_cache_size", 0)
+        G.persistent_decision_cache.load()
         sublime.set_timeout_async(_run_on_startup_views)
 
 
 def plugin_unloaded() -> None:
+    G.detection_executor.shutdown()
+    G.rule_profiler.disable()
+    G.magika_batcher.session.release()
+    G.magika_session.release()
+    G.persistent_decision_cache.save()
+    if G.magika_prediction_cache.is_persistent:
+        G.magika_prediction_cache.save()
     AioSettings.clear_on_change(PLUGIN_NAME)
     AioSettings.tear_down()
 
@@ -93,8 +117,56 @@ def plugin_unloaded() -> None:
 
 def _settings_changed_callback(window: sublime.Window) -> None:
     clear_all_cached_functions()
+    G.syntax_decision_caches.pop(window, None)
+    _set_up_fs_probe_cache()
+    _set_up_magika_prediction_cache()
+    _set_up_magika_session()
+    _set_up_rule_profiler()
     compile_rules(window, is_update=True)
 
+    if not any(get_merged_plugin_setting("magika.enabled", False, window=window) for window in sublime.windows()):
+        G.magika_batcher.session.release()
+        G.magika_session.release()
+
+
+def _set_up_fs_probe_cache() -> None:
+    G.fs_probe_cache.ttl_s = get_merged_plugin_setting("fs_cache_ttl", 3.0)
+    G.fs_probe_cache.maxsize = get_merged_plugin_setting("fs_cache_size", 4096)
+    G.fs_probe_cache.clear()
+    G.project_marker_index.clear()
+    G.django_root_results.clear()
+
+
+def _set_up_magika_prediction_cache() -> None:
+    cache = G.magika_prediction_cache
+    cache.maxsize = get_merged_plugin_setting("magika.cache_size", 1000)
+    is_persistent: bool = get_merged_plugin_setting("magika.cache_persistent", False)
+    if is_persistent and not cache.is_persistent:
+        cache.load()
+    cache.is_persistent = is_persistent
+
+
+def _set_up_magika_session() -> None:
+    python: str = get_merged_plugin_setting("magika.worker_python", "")
+    timeout_s: float = get_merged_plugin_setting("magika.worker_timeout", 10.0)
+    session = G.magika_batcher.session
+    if isinstance(session, MagikaSubprocessSession):
+        if session.python == python:
+            session.timeout_s = timeout_s
+            return
+        session.release()
+    elif not python:
+        return
+
+    G.magika_batcher.session = MagikaSubprocessSession(python, timeout_s=timeout_s) if python else G.magika_session
+
+
+def _set_up_rule_profiler() -> None:
+    if get_merged_plugin_setting("profile_rules", False):
+        G.rule_profiler.enable((SyntaxRule, MatchRule, ConstraintRule, *get_constraints()))
+    else:
+        G.rule_profiler.disable()
+
 
 def _add_python_lib_path() -> None:
     if (path := str(PLUGIN_PY_LIBS_DIR)) not in sys.path:
@@ -117,5 +189,4 @@ def _load_custom_implementations() -> None:
 
 
 def _run_on_startup_views() -> None:
-    for view in G.startup_views:
-        run_auto_set_syntax_on_view(view, ListenerEvent.INIT)
+    run_auto_set_syntax_on_startup_views(G.startup_views)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from functools import _lru_cache_wrapper, lru_cache
-from typing import Any, Callable, TypeVar, cast
+from typing import Any, Callable, Generic, TypeVar, cast
 
 _cached_functions: set[_lru_cache_wrapper] = set()
 
+_K = TypeVar("_K")
+_V = TypeVar("_V")
 _T_Callable = TypeVar("_T_Callable", bound=Callable[..., Any])
 
 
@@ -20,3 +24,47 @@ def clearable_lru_cache(*args: Any, **kwargs: Any) -> Callable[[_T_Callable], _T
 def clear_all_cached_functions() -> None:
     for func in _cached_functions:
         func.cache_clear()
+
+
+class LruCache(Generic[_K, _V]):
+    """A thread-safe mapping-like cache which evicts the least recently used item when it's full."""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[_K, _V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: _K) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key: _K, default: _V | None = None) -> _V | None:
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: _K, value: _V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self) -> list[tuple[_K, _V]]:
+        """Lists items from the least recently used one to the most recently used one."""
+        with self._lock:
+            return list(self._data.items())
+
+    def pop(self, key: _K, default: _V | None = None) -> _V | None:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
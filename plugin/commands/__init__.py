@@ -1,10 +1,16 @@
-from .auto_set_syntax import AutoSetSyntaxCommand, run_auto_set_syntax_on_view
+from .auto_set_syntax import (
+    AutoSetSyntaxCommand,
+    prefetch_magika_predictions,
+    run_auto_set_syntax_on_startup_views,
+    run_auto_set_syntax_on_view,
+)
 from .auto_set_syntax_create_new_implementation import (
     AutoSetSyntaxCreateNewConstraintCommand,
     AutoSetSyntaxCreateNewMatchCommand,
 )
 from .auto_set_syntax_debug_information import AutoSetSyntaxDebugInformationCommand
 from .auto_set_syntax_download_dependencies import AutoSetSyntaxDownloadDependenciesCommand
+from .auto_set_syntax_profile_report import AutoSetSyntaxProfileReportCommand
 
 __all__ = (
     # ST: commands
@@ -13,6 +19,9 @@ __all__ = (
     "AutoSetSyntaxCreateNewMatchCommand",
     "AutoSetSyntaxDebugInformationCommand",
     "AutoSetSyntaxDownloadDependenciesCommand",
+    "AutoSetSyntaxProfileReportCommand",
     # ...
+    "prefetch_magika_predictions",
+    "run_auto_set_syntax_on_startup_views",
     "run_auto_set_syntax_on_view",
 )
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
+import os
 import re
+import threading
 from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable
 
 import sublime
 import sublime_plugin
 
 from ..constants import PLUGIN_NAME, RE_ST_SYNTAX_TEST_LINE, RE_VIM_SYNTAX_LINE, VIEW_KEY_IS_ASSIGNED
 from ..helpers import is_syntaxable_view, resolve_magika_label_with_syntax_map
+from ..incremental import ConstraintMemo
 from ..logger import Logger
+from ..magika_session import MagikaSample, MagikaWorkerError
+from ..persistent_cache import PersistentDecision
 from ..rules import SyntaxRuleCollection
 from ..settings import get_merged_plugin_setting, get_merged_plugin_settings, pref_trim_suffixes
-from ..shared import G
+from ..shared import DecisionFingerprint, G, SyntaxDecisionCache
 from ..snapshot import ViewSnapshot
-from ..types import ListenerEvent
+from ..types import ListenerEvent, SyntaxDecision
 from ..utils import (
     extract_prefixed_dict,
     find_syntax_by_syntax_like,
@@ -27,6 +32,23 @@ from ..utils import (
     stringify,
 )
 
+ASYNC_EVALUATION_EVENTS = {
+    ListenerEvent.INIT,
+    ListenerEvent.LOAD,
+    ListenerEvent.RELOAD,
+    ListenerEvent.REVERT,
+    ListenerEvent.SAVE,
+    ListenerEvent.UNTRANSIENTIZE,
+}
+"""Events which are triggered on the main thread and can be evaluated on the worker thread when enabled."""
+
+_magika_deferral = threading.local()
+"""Whether Magika predictions are deferred on the current thread. See `run_auto_set_syntax_on_startup_views()`."""
+
+
+class _MagikaDeferred(Exception):
+    """Raised by the Magika step when Magika predictions are deferred on the current thread."""
+
 
 class AutoSetSyntaxCommand(sublime_plugin.TextCommand):
     def description(self) -> str:
@@ -41,7 +63,14 @@ def run_auto_set_syntax_on_view(
     event: ListenerEvent | None = None,
     *,
     must_plaintext: bool = False,
+    incremental: bool = False,
 ) -> bool:
+    """
+    Runs AutoSetSyntax on the `view`.
+
+    If `incremental` is `True`, results of constraint rules from the last incremental run are re-used
+    as long as their inputs have not been changed since then.
+    """
     if not ((window := view.window()) and G.is_plugin_ready(window) and view.is_valid()):
         Logger.log("⏳ Calm down! View has gone or the plugin is not ready yet.")
         return False
@@ -49,7 +78,9 @@ def run_auto_set_syntax_on_view(
     view_snapshot = ViewSnapshot.from_view(view)
 
     if event is ListenerEvent.EXEC:
-        return _assign_syntax_for_exec_output(view_snapshot, event)
+        if decision := _find_syntax_for_exec_output(view_snapshot, event):
+            return _apply_syntax_decision(view, decision)
+        return False
 
     # prerequsites
     if not (
@@ -60,16 +91,124 @@ def run_auto_set_syntax_on_view(
         return False
 
     if event is ListenerEvent.NEW:
-        return _assign_syntax_for_new_view(view_snapshot, event)
+        if decision := _find_syntax_for_new_view(view_snapshot, event):
+            return _apply_syntax_decision(view, decision)
+        return False
+
+    generation = syntax_rule_collection.generation
+    if incremental:
+        memo = G.constraint_memos.get(view.buffer_id())
+        view_snapshot.constraint_results = memo.carry_over() if memo and memo.is_valid_for(view, generation) else {}
+    else:
+        G.constraint_memos.pop(view.buffer_id())
+
+    if event in ASYNC_EVALUATION_EVENTS and get_merged_plugin_setting("async_evaluation", window=window):
+        workers: int = get_merged_plugin_setting("async_evaluation_workers", 2, window=window)
+        G.detection_executor.max_workers = max(1, workers)
+        G.detection_executor.submit(
+            view.buffer_id(),
+            lambda is_superseded: _run_auto_set_syntax_async(
+                view_snapshot, syntax_rule_collection, event, must_plaintext, is_superseded
+            ),
+        )
+        return False
+
+    decision, is_cached = _decide_syntax_with_caches(view_snapshot, syntax_rule_collection, event, must_plaintext)
+    if incremental and not is_cached:
+        G.constraint_memos.set(view.buffer_id(), ConstraintMemo.from_snapshot(view_snapshot, generation))
+    return _apply_syntax_decision_or_sorry(view, decision, event, is_cached=is_cached)
+
+
+def run_auto_set_syntax_on_startup_views(views: Iterable[sublime.View]) -> None:
+    """
+    Runs AutoSetSyntax on startup views.
+
+    Magika is deferred at first, so views decided by persisted decisions or cheaper steps are never predicted.
+    Views which reach the Magika step are then predicted by a single batched call and run again.
+    """
+    deferred_views: list[sublime.View] = []
+    _magika_deferral.is_active = True
+    try:
+        for view in views:
+            try:
+                run_auto_set_syntax_on_view(view, ListenerEvent.INIT)
+            except _MagikaDeferred:
+                deferred_views.append(view)
+    finally:
+        _magika_deferral.is_active = False
 
-    if _assign_syntax_for_st_syntax_test(view_snapshot, event):
-        return True
+    prefetch_magika_predictions(deferred_views, ListenerEvent.INIT)
+    for view in deferred_views:
+        run_auto_set_syntax_on_view(view, ListenerEvent.INIT)
 
-    if _assign_syntax_with_plugin_rules(view_snapshot, syntax_rule_collection, event):
-        return True
 
-    if _assign_syntax_with_first_line(view_snapshot, event):
-        return True
+def _run_auto_set_syntax_async(
+    view_snapshot: ViewSnapshot,
+    syntax_rule_collection: SyntaxRuleCollection,
+    event: ListenerEvent | None,
+    must_plaintext: bool,
+    is_superseded: Callable[[], bool],
+) -> None:
+    """Decides the syntax on the worker thread and then applies it on the main thread."""
+    if is_superseded():
+        return
+
+    decision, is_cached = _decide_syntax_with_caches(view_snapshot, syntax_rule_collection, event, must_plaintext)
+
+    def apply() -> None:
+        if is_superseded():
+            return
+        if not view_snapshot.is_up_to_date():
+            Logger.log(
+                lambda: f"⏳ Discard the decision for {stringify(view_snapshot.view)} because it has been changed.",
+                window=view_snapshot.window,
+            )
+            return
+        _apply_syntax_decision_or_sorry(view_snapshot.view, decision, event, is_cached=is_cached)
+
+    sublime.set_timeout(apply)
+
+
+def _decide_syntax_with_caches(
+    view_snapshot: ViewSnapshot,
+    syntax_rule_collection: SyntaxRuleCollection,
+    event: ListenerEvent | None,
+    must_plaintext: bool,
+) -> tuple[SyntaxDecision | None, bool]:
+    """Returns `(decision, is_cached)`."""
+    view = view_snapshot.view
+    decision_cache = G.syntax_decision_caches.setdefault(view_snapshot.window, SyntaxDecisionCache())
+    cache_key = (view.buffer_id(), event, must_plaintext)
+    fingerprint = _make_decision_fingerprint(view_snapshot, syntax_rule_collection)
+
+    # the user explicitly asks for a fresh run via the command
+    if event is not ListenerEvent.COMMAND and (cached := decision_cache.get(cache_key)) and cached[0] == fingerprint:
+        if decision := cached[1]:
+            details = {**decision.details, "reason": f"[CACHED] {decision.details['reason']}"}
+            return SyntaxDecision(decision.syntax, details), True
+        return None, True
+
+    if event is ListenerEvent.INIT:
+        decision = _decide_syntax_with_persistent_cache(view_snapshot, syntax_rule_collection, event)
+    else:
+        decision = _decide_syntax(view_snapshot, syntax_rule_collection, event)
+    decision_cache.set(cache_key, (fingerprint, decision))
+    return decision, False
+
+
+def _decide_syntax(
+    view_snapshot: ViewSnapshot,
+    syntax_rule_collection: SyntaxRuleCollection,
+    event: ListenerEvent | None = None,
+) -> SyntaxDecision | None:
+    if decision := _find_syntax_for_st_syntax_test(view_snapshot, event):
+        return decision
+
+    if decision := _find_syntax_with_plugin_rules(view_snapshot, syntax_rule_collection, event):
+        return decision
+
+    if decision := _find_syntax_with_first_line(view_snapshot, event):
+        return decision
 
     if event in {
         ListenerEvent.COMMAND,
@@ -77,8 +216,8 @@ def run_auto_set_syntax_on_view(
         ListenerEvent.LOAD,
         ListenerEvent.SAVE,
         ListenerEvent.UNTRANSIENTIZE,
-    } and _assign_syntax_with_trimmed_filename(view_snapshot, event):
-        return True
+    } and (decision := _find_syntax_with_trimmed_filename(view_snapshot, event)):
+        return decision
 
     if event in {
         ListenerEvent.COMMAND,
@@ -88,16 +227,95 @@ def run_auto_set_syntax_on_view(
         ListenerEvent.PASTE,
         ListenerEvent.SAVE,
         ListenerEvent.UNTRANSIENTIZE,
-    } and _assign_syntax_with_magika(view_snapshot, event):
-        return True
+    } and (decision := _find_syntax_with_magika(view_snapshot, event)):
+        return decision
+
+    return _find_syntax_with_heuristics(view_snapshot, event)
+
+
+def _decide_syntax_with_persistent_cache(
+    view_snapshot: ViewSnapshot,
+    syntax_rule_collection: SyntaxRuleCollection,
+    event: ListenerEvent | None = None,
+) -> SyntaxDecision | None:
+    view = view_snapshot.view
+    if not (file_name := view.file_name()) or view.is_dirty():
+        return _decide_syntax(view_snapshot, syntax_rule_collection, event)
+
+    persistent_cache = G.persistent_decision_cache
+    settings_hash = syntax_rule_collection.settings_hash
+    syntax_before = view_snapshot.syntax.path if view_snapshot.syntax else ""
+
+    if entry := persistent_cache.get(file_name, settings_hash, syntax_before):
+        if not entry.syntax:
+            return None
+        if syntax := sublime.syntax_from_path(entry.syntax):
+            return SyntaxDecision(syntax, details={"event": event, "reason": f"[PERSISTED] {entry.reason}"})
+
+    decision = _decide_syntax(view_snapshot, syntax_rule_collection, event)
+    try:
+        stat = os.stat(file_name)
+    except OSError:
+        return decision
+
+    persistent_cache.set(
+        PersistentDecision(
+            path=file_name,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            settings_hash=settings_hash,
+            syntax_before=syntax_before,
+            syntax=decision.syntax.path if decision else "",
+            reason=decision.details["reason"] if decision else "no matching rule",
+        )
+    )
+    return decision
+
+
+def _make_decision_fingerprint(
+    view_snapshot: ViewSnapshot,
+    syntax_rule_collection: SyntaxRuleCollection,
+) -> DecisionFingerprint:
+    """Things which make a cached decision outdated if any of them changes."""
+    view = view_snapshot.view
+    file_stat: tuple[int, int] | None = None
+    if file_name := view.file_name():
+        try:
+            stat = os.stat(file_name)
+            file_stat = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+
+    return (
+        view_snapshot.change_count,
+        file_name or "",
+        file_stat,
+        syntax_rule_collection.generation,
+        view_snapshot.syntax.path if view_snapshot.syntax else "",
+    )
+
 
-    if _assign_syntax_with_heuristics(view_snapshot, event):
-        return True
+def _apply_syntax_decision(view: sublime.View, decision: SyntaxDecision) -> bool:
+    # `assign_syntax_to_view` modifies `details` so we give it a copy
+    return assign_syntax_to_view(view, decision.syntax, details={**decision.details})
 
-    return _sorry_cannot_help(view, event)
+
+def _apply_syntax_decision_or_sorry(
+    view: sublime.View,
+    decision: SyntaxDecision | None,
+    event: ListenerEvent | None = None,
+    *,
+    is_cached: bool = False,
+) -> bool:
+    if decision:
+        return _apply_syntax_decision(view, decision)
+    return _sorry_cannot_help(view, event, is_cached=is_cached)
 
 
-def _assign_syntax_for_exec_output(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+def _find_syntax_for_exec_output(
+    view_snapshot: ViewSnapshot,
+    event: ListenerEvent | None = None,
+) -> SyntaxDecision | None:
     if (
         (view := view_snapshot.valid_view)
         and (window := view.window())
@@ -105,61 +323,63 @@ def _assign_syntax_for_exec_output(view_snapshot: ViewSnapshot, event: ListenerE
         and (exec_file_syntax := get_merged_plugin_setting("exec_file_syntax", window=window))
         and (syntax := find_syntax_by_syntax_like(exec_file_syntax, include_hidden=True))
     ):
-        return assign_syntax_to_view(
-            view,
+        return SyntaxDecision(
             syntax,
             details={"event": event, "reason": "exec output", "exec_file_syntax": exec_file_syntax},
         )
-    return False
+    return None
 
 
-def _assign_syntax_for_new_view(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+def _find_syntax_for_new_view(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> SyntaxDecision | None:
     if (
         (view := view_snapshot.valid_view)
         and (window := view.window())
         and (new_file_syntax := get_merged_plugin_setting("new_file_syntax", window=window))
         and (syntax := find_syntax_by_syntax_like(new_file_syntax, include_plaintext=False))
     ):
-        return assign_syntax_to_view(
-            view,
+        return SyntaxDecision(
             syntax,
             details={"event": event, "reason": "new file", "new_file_syntax": new_file_syntax},
         )
-    return False
+    return None
 
 
-def _assign_syntax_for_st_syntax_test(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+def _find_syntax_for_st_syntax_test(
+    view_snapshot: ViewSnapshot,
+    event: ListenerEvent | None = None,
+) -> SyntaxDecision | None:
     if (
-        (view := view_snapshot.valid_view)
+        view_snapshot.valid_view
         and (not view_snapshot.syntax or is_plaintext_syntax(view_snapshot.syntax))
         and (m := RE_ST_SYNTAX_TEST_LINE.search(view_snapshot.first_line))
         and (new_syntax := m.group("syntax")).endswith(".sublime-syntax")
         and (syntax := find_syntax_by_syntax_like(new_syntax, include_hidden=True, include_plaintext=True))
     ):
-        return assign_syntax_to_view(
-            view,
+        return SyntaxDecision(
             syntax,
             details={"event": event, "reason": "Sublime Test syntax test file"},
         )
-    return False
+    return None
 
 
-def _assign_syntax_with_plugin_rules(
+def _find_syntax_with_plugin_rules(
     view_snapshot: ViewSnapshot,
     syntax_rule_collection: SyntaxRuleCollection,
     event: ListenerEvent | None = None,
-) -> bool:
-    if (view := view_snapshot.valid_view) and (syntax_rule := syntax_rule_collection.test(view_snapshot, event)):
+) -> SyntaxDecision | None:
+    if view_snapshot.valid_view and (syntax_rule := syntax_rule_collection.test(view_snapshot, event)):
         assert syntax_rule.syntax  # otherwise it should be dropped during optimizing
-        return assign_syntax_to_view(
-            view,
+        return SyntaxDecision(
             syntax_rule.syntax,
             details={"event": event, "reason": "plugin rule", "rule": syntax_rule},
         )
-    return False
+    return None
 
 
-def _assign_syntax_with_first_line(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+def _find_syntax_with_first_line(
+    view_snapshot: ViewSnapshot,
+    event: ListenerEvent | None = None,
+) -> SyntaxDecision | None:
     # Note that this only works for files under some circumstances.
     # This is to prevent from, for example, changing a ".erb" (Rails HTML template) file into HTML syntax.
     # But we want to change a file whose name is "cpp" with a Python shebang into Python syntax.
@@ -187,18 +407,17 @@ def _assign_syntax_with_first_line(view_snapshot: ViewSnapshot, event: ListenerE
                 return syntax
         return None
 
-    if not (view := view_snapshot.valid_view):
-        return False
+    if not view_snapshot.valid_view:
+        return None
 
     # It's potentially that a first line of a syntax is a prefix of another syntax's.
     # Thus if the user is typing, only try assigning syntax if this is not triggered by the first line.
     if event is ListenerEvent.MODIFY and view_snapshot.caret_rowcol[0] == 0:
-        return False
+        return None
 
     for checker in (_prefer_shebang, _prefer_vim_modeline, _prefer_general_first_line):
         if syntax := checker(view_snapshot):
-            return assign_syntax_to_view(
-                view,
+            return SyntaxDecision(
                 syntax,
                 details={
                     "event": event,
@@ -206,10 +425,13 @@ def _assign_syntax_with_first_line(view_snapshot: ViewSnapshot, event: ListenerE
                 },
             )
 
-    return False
+    return None
 
 
-def _assign_syntax_with_trimmed_filename(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+def _find_syntax_with_trimmed_filename(
+    view_snapshot: ViewSnapshot,
+    event: ListenerEvent | None = None,
+) -> SyntaxDecision | None:
     if not (
         (view := view_snapshot.valid_view)
         and (filepath := view.file_name())
@@ -217,7 +439,7 @@ def _assign_syntax_with_trimmed_filename(view_snapshot: ViewSnapshot, event: Lis
         and (syntax_old := view.syntax())
         and is_plaintext_syntax(syntax_old)
     ):
-        return False
+        return None
 
     original = Path(filepath).name
     trim_suffixes = pref_trim_suffixes(window=window)
@@ -230,8 +452,7 @@ def _assign_syntax_with_trimmed_filename(view_snapshot: ViewSnapshot, event: Lis
 
     for filename in filenames:
         if (syntax := sublime.find_syntax_for_file(filename)) and not is_plaintext_syntax(syntax):
-            return assign_syntax_to_view(
-                view,
+            return SyntaxDecision(
                 syntax,
                 details={
                     "event": event,
@@ -242,15 +463,54 @@ def _assign_syntax_with_trimmed_filename(view_snapshot: ViewSnapshot, event: Lis
                     "trim_suffixes_auto": trim_suffixes_auto,
                 },
             )
-    return False
+    return None
 
 
-def _assign_syntax_with_magika(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+def _find_syntax_with_magika(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> SyntaxDecision | None:
+    if not (
+        (sample := _make_magika_sample(view_snapshot, event))
+        and (window := view_snapshot.window)
+        and (settings := get_merged_plugin_settings(window=window))
+    ):
+        return None
+
+    if getattr(_magika_deferral, "is_active", False):
+        raise _MagikaDeferred
+
+    try:
+        prediction = G.magika_batcher.predict(sample)
+    except ImportError as e:
+        Logger.log(f"💣 Error occured when importing Magika: {e}", window=window)
+        return None
+    except MagikaWorkerError as e:
+        Logger.log(f"💣 Magika worker failed: {e}", window=window)
+        return None
+    # Logger.log(f"🐛 Magika's prediction: {prediction}", window=window)
+
+    threadshold: float = settings.get("magika.min_confidence", 0.0)
+    if prediction.score < threadshold or prediction.label in {"directory", "empty", "txt", "unknown"}:
+        return None
+
+    syntax_map: dict[str, list[str]] = extract_prefixed_dict(settings, prefix="magika.syntax_map.")
+    if not (syntax_likes := resolve_magika_label_with_syntax_map(prediction.label, syntax_map)):
+        Logger.log(f"😢 Magika syntax map resolution failed for label: {prediction.label}", window=window)
+        return None
+
+    if not (syntax := find_syntax_by_syntax_likes(syntax_likes, include_plaintext=False)):
+        Logger.log(f"😢 Failed finding syntax from Magika: {syntax_likes}", window=window)
+        return None
+
+    confidence = round(prediction.score * 100, 2)
+    sublime.status_message(f"Predicted syntax: {prediction.label} ({confidence}% confidence)")
+    return SyntaxDecision(syntax, details={"event": event, "reason": "Magika (Deep Learning)"})
+
+
+def _make_magika_sample(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> MagikaSample | None:
+    """Makes the sample of the view to be predicted by Magika. `None` if Magika shouldn't be used."""
     if not (
         (view := view_snapshot.valid_view)
         and (window := view.window())
-        and (settings := get_merged_plugin_settings(window=window))
-        and settings.get("magika.enabled")
+        and get_merged_plugin_setting("magika.enabled", window=window)
         # don't apply on those have an extension
         and (event == ListenerEvent.COMMAND or "." not in view_snapshot.file_name_unhidden)
         # only apply on plain text syntax
@@ -260,40 +520,38 @@ def _assign_syntax_with_magika(view_snapshot: ViewSnapshot, event: ListenerEvent
         # right after "import" is typed but it could be JavaScript or TypeScript as well
         and (event != ListenerEvent.MODIFY or "\n" in view_snapshot.content)
     ):
-        return False
-
-    try:
-        from magika import Magika
-    except ImportError as e:
-        Logger.log(f"💣 Error occured when importing Magika: {e}", window=window)
-        return False
-
-    classifier = Magika()
-    if not view.is_dirty() and view_snapshot.path_obj:
-        result = classifier.identify_path(view_snapshot.path_obj)
-    else:
-        result = classifier.identify_bytes(view_snapshot.content.encode())
-    # Logger.log(f"🐛 Magika's prediction: {result.output}", window=window)
+        return None
 
-    threadshold: float = settings.get("magika.min_confidence", 0.0)
-    if result.output.score < threadshold or result.output.ct_label in {"directory", "empty", "txt", "unknown"}:
-        return False
+    if not view.is_dirty() and (path := view_snapshot.path_obj):
+        # the file has been sampled for rules, so don't let Magika read it again
+        if (file_sample := view_snapshot.file_sample) and file_sample[1]:
+            return file_sample[1]
+        return path
+    return view_snapshot.content_bytes
 
-    syntax_map: dict[str, list[str]] = extract_prefixed_dict(settings, prefix="magika.syntax_map.")
-    if not (syntax_likes := resolve_magika_label_with_syntax_map(result.output.ct_label, syntax_map)):
-        Logger.log(f"😢 Magika syntax map resolution failed for label: {result.output.ct_label}", window=window)
-        return False
 
-    if not (syntax := find_syntax_by_syntax_likes(syntax_likes, include_plaintext=False)):
-        Logger.log(f"😢 Failed finding syntax from Magika: {syntax_likes}", window=window)
-        return False
+def prefetch_magika_predictions(views: Iterable[sublime.View], event: ListenerEvent) -> None:
+    """Predicts views, which may need Magika, by a single batched call. Results are used when they are tested."""
+    samples = [
+        sample
+        for view in views
+        if view.is_valid() and (sample := _make_magika_sample(ViewSnapshot.from_view(view), event))
+    ]
+    if not samples:
+        return
 
-    confidence = round(result.output.score * 100, 2)
-    sublime.status_message(f"Predicted syntax: {result.output.ct_label} ({confidence}% confidence)")
-    return assign_syntax_to_view(view, syntax, details={"event": event, "reason": "Magika (Deep Learning)"})
+    try:
+        G.magika_batcher.prefetch(samples)
+    except (ImportError, MagikaWorkerError):
+        # it will be logged when a view is tested
+        return
+    Logger.log(f"🔮 Prefetched Magika predictions for {len(samples)} views by a batched call")
 
 
-def _assign_syntax_with_heuristics(view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+def _find_syntax_with_heuristics(
+    view_snapshot: ViewSnapshot,
+    event: ListenerEvent | None = None,
+) -> SyntaxDecision | None:
     def is_large_file(view_snapshot: ViewSnapshot) -> bool:
         return view_snapshot.char_count >= 10 * 1024  # 10KB
 
@@ -314,18 +572,18 @@ def _assign_syntax_with_heuristics(view_snapshot: ViewSnapshot, event: ListenerE
             or (text_begin.startswith("[{") and text_end.endswith("}]"))
         )
 
-    if not ((view := view_snapshot.valid_view) and view_snapshot.syntax and is_plaintext_syntax(view_snapshot.syntax)):
-        return False
+    if not (view_snapshot.valid_view and view_snapshot.syntax and is_plaintext_syntax(view_snapshot.syntax)):
+        return None
 
     if is_json(view_snapshot) and (syntax := find_syntax_by_syntax_like("scope:source.json")):
-        return assign_syntax_to_view(view, syntax, details={"event": event, "reason": "heuristics"})
+        return SyntaxDecision(syntax, details={"event": event, "reason": "heuristics"})
 
-    return False
+    return None
 
 
-def _sorry_cannot_help(view: sublime.View, event: ListenerEvent | None = None) -> bool:
-    details = {"event": event, "reason": "no matching rule"}
-    Logger.log(f"❌ Cannot help {stringify(view)} because {stringify(details)}", window=view.window())
+def _sorry_cannot_help(view: sublime.View, event: ListenerEvent | None = None, *, is_cached: bool = False) -> bool:
+    details = {"event": event, "reason": "[CACHED] no matching rule" if is_cached else "no matching rule"}
+    Logger.log(lambda: f"❌ Cannot help {stringify(view)} because {stringify(details)}", window=view.window())
     return False
 
 
@@ -350,7 +608,7 @@ def assign_syntax_to_view(
         if syntax == (syntax_old := view.syntax() or sublime.Syntax("", "", False, "")):
             details["reason"] = f'[ALREADY] {details["reason"]}'
             Logger.log(
-                f'💯 Remain {stringify(_view)} syntax "{get_syntax_name(syntax)}" because {stringify(details)}',
+                lambda: f'💯 Remain {stringify(_view)} syntax "{get_syntax_name(syntax)}" because {stringify(details)}',
                 window=_window,
             )
             continue
@@ -358,8 +616,10 @@ def assign_syntax_to_view(
         _view.assign_syntax(syntax)
         _view.settings().set(VIEW_KEY_IS_ASSIGNED, True)
         Logger.log(
-            f"✔ Change {stringify(_view)} syntax"
-            + f' from "{get_syntax_name(syntax_old)}" to "{get_syntax_name(syntax)}" because {stringify(details)}',
+            lambda: (
+                f"✔ Change {stringify(_view)} syntax"
+                + f' from "{get_syntax_name(syntax_old)}" to "{get_syntax_name(syntax)}" because {stringify(details)}'
+            ),
             window=_window,
         )
 
@@ -40,6 +40,12 @@ TEMPLATE = f"""
 ########################
 
 {{dropped_rules}}
+
+######################
+# Detection executor #
+######################
+
+{{detection_executor}}
 """.lstrip()
 
 
@@ -65,6 +71,11 @@ class AutoSetSyntaxDebugInformationCommand(sublime_plugin.WindowCommand):
         info["plugin_settings"] = get_merged_plugin_settings(window=self.window)
         info["syntax_rule_collection"] = G.syntax_rule_collections.get(self.window)
         info["dropped_rules"] = G.dropped_rules_collection.get(self.window, [])
+        info["detection_executor"] = {
+            "max_workers": G.detection_executor.max_workers,
+            "queue_depth": G.detection_executor.queue_depth,
+            **G.detection_executor.stats.to_dict(),
+        }
 
         content = TEMPLATE.format_map(_pythonize(info))
 
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections.abc import Generator
+from typing import Any
+
+import sublime
+import sublime_plugin
+
+from ..constants import PLUGIN_NAME, VIEW_KEY_IS_CREATED
+from ..profiler import RuleStats, format_stats_table
+from ..rules import AbstractConstraint, ConstraintRule, MatchRule, SyntaxRule
+from ..shared import G
+
+TEMPLATE = f"""
+# === {PLUGIN_NAME} Profile Report === #
+# Rules are sorted by the total time of testing them in descending order.
+# Time of a rule includes time of rules in it.
+
+################
+# Syntax rules #
+################
+
+{{syntax_rules}}
+
+###############
+# Match rules #
+###############
+
+{{match_rules}}
+
+####################
+# Constraint rules #
+####################
+
+{{constraint_rules}}
+
+#############################
+# Constraints (by instance) #
+#############################
+
+{{constraint_instances}}
+
+##########################
+# Constraints (by class) #
+##########################
+
+{{constraint_classes}}
+""".lstrip()
+
+
+class AutoSetSyntaxProfileReportCommand(sublime_plugin.WindowCommand):
+    def description(self) -> str:
+        return f"{PLUGIN_NAME}: Profile Report"
+
+    def run(self, *, reset: bool = False) -> None:
+        if not (G.rule_profiler.is_enabled or G.rule_profiler.stats):
+            sublime.message_dialog(f'{PLUGIN_NAME}: Enable "profile_rules" in settings to profile rules.')
+            return
+
+        content = TEMPLATE.format_map(self._make_tables())
+        if reset:
+            G.rule_profiler.reset()
+
+        view = self.window.new_file()
+        view.set_name(f"{PLUGIN_NAME} Profile Report")
+        view.set_scratch(True)
+        view.run_command("append", {"characters": content})
+        view.settings().update({
+            VIEW_KEY_IS_CREATED: True,
+            "word_wrap": False,
+        })
+
+    def _make_tables(self) -> dict[str, str]:
+        labels = dict(self._iter_labels())
+        rows: dict[str, list[tuple[str, RuleStats]]] = {
+            "syntax_rules": [],
+            "match_rules": [],
+            "constraint_rules": [],
+            "constraint_instances": [],
+        }
+        classes: dict[str, RuleStats] = {}
+        for stats in list(G.rule_profiler.stats.values()):
+            target = stats.target
+            label = labels.get(id(target), f"(not in the current rules) {_describe(target)}")
+            if isinstance(target, SyntaxRule):
+                rows["syntax_rules"].append((label, stats))
+            elif isinstance(target, MatchRule):
+                rows["match_rules"].append((label, stats))
+            elif isinstance(target, ConstraintRule):
+                rows["constraint_rules"].append((label, stats))
+            elif isinstance(target, AbstractConstraint):
+                rows["constraint_instances"].append((_describe(target), stats))
+                if (class_stats := classes.get(name := target.name())) is None:
+                    class_stats = classes[name] = RuleStats(type(target))
+                class_stats.merge(stats)
+
+        return {
+            **{key: format_stats_table(value) for key, value in rows.items()},
+            "constraint_classes": format_stats_table(classes.items()),
+        }
+
+    def _iter_labels(self) -> Generator[tuple[int, str], None, None]:
+        """Yields `(id(rule), label)` for rules in the current collection, labeled by their positions."""
+
+        def iter_match_rule(rule: MatchRule, path: str) -> Generator[tuple[int, str], None, None]:
+            yield (id(rule), path)
+            for idx, child in enumerate(rule.rules):
+                if isinstance(child, MatchRule):
+                    yield from iter_match_rule(child, f"{path}/{idx}:{child.match_name}")
+                else:
+                    yield (id(child), f"{path}/{idx}:{_describe(child)}")
+
+        if not (collection := G.syntax_rule_collections.get(self.window)):
+            return
+        for idx, rule in enumerate(collection.rules):
+            yield (id(rule), f"#{idx} {_describe(rule)}")
+            if rule.root_rule:
+                yield from iter_match_rule(rule.root_rule, f"#{idx}/{rule.root_rule.match_name}")
+
+
+def _describe(obj: Any) -> str:
+    if isinstance(obj, SyntaxRule):
+        return obj.comment or ", ".join(obj.syntaxes_name or ())
+    if isinstance(obj, MatchRule):
+        return obj.match_name
+    if isinstance(obj, ConstraintRule):
+        return f"{'!' if obj.inverted else ''}{obj.constraint_name}{list(obj.args) if obj.args else ''}"
+    if isinstance(obj, AbstractConstraint):
+        return f"{obj.name()}{list(obj.args) if obj.args else ''}"
+    return repr(obj)
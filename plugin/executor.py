@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import count
+from typing import Any, Callable, Hashable
+
+from .constants import PLUGIN_NAME
+
+IsSuperseded = Callable[[], bool]
+Job = Callable[[IsSuperseded], Any]
+
+
+@dataclass
+class ExecutorStats:
+    """Metrics of a `CoalescingExecutor`."""
+
+    submitted: int = 0
+    """The amount of submitted jobs."""
+    superseded: int = 0
+    """The amount of jobs which are superseded by newer jobs for the same key."""
+    completed: int = 0
+    """The amount of jobs which are finished, including failed ones."""
+    failed: int = 0
+    """The amount of jobs which raised an exception."""
+    queue_depth_max: int = 0
+    """The max amount of pending jobs ever."""
+    wait_ms_total: float = 0.0
+    """The total time which jobs wait in the queue."""
+    wait_ms_max: float = 0.0
+    run_ms_total: float = 0.0
+    """The total time which jobs take to run."""
+    run_ms_max: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        completed = self.completed or 1
+        return {
+            "submitted": self.submitted,
+            "superseded": self.superseded,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_depth_max": self.queue_depth_max,
+            "wait_ms_avg": round(self.wait_ms_total / completed, 3),
+            "wait_ms_max": round(self.wait_ms_max, 3),
+            "run_ms_avg": round(self.run_ms_total / completed, 3),
+            "run_ms_max": round(self.run_ms_max, 3),
+        }
+
+
+@dataclass
+class _PendingJob:
+    job: Job
+    token: int
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+class CoalescingExecutor:
+    """
+    A size-limited pool of worker threads, which runs at most one pending job per key.
+
+    Submitting a job for a key supersedes the queued or running job of the same key.
+    A queued job is replaced directly. A running job can't be interrupted, but it can
+    (and should) check `is_superseded()`, which is given as its argument, to discard its result.
+
+    After `shutdown()`, the pool can still be used. Workers are started again by following jobs.
+    """
+
+    def __init__(self, max_workers: int = 2, *, name: str = f"{PLUGIN_NAME}-worker") -> None:
+        self.max_workers = max_workers
+        self.name = name
+        self.stats = ExecutorStats()
+        self._cond = threading.Condition()
+        self._queue: deque[Hashable] = deque()
+        self._pending: dict[Hashable, _PendingJob] = {}
+        self._tokens: dict[Hashable, int] = {}
+        """The token of the latest job for each key."""
+        self._token_counter = count(1)
+        self._running: Counter[Hashable] = Counter()
+        self._workers: list[threading.Thread] = []
+        self._generation = 0
+        """Increased by `shutdown()`. Workers of a previous generation stop after their current jobs."""
+
+    @property
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def submit(self, key: Hashable, job: Job) -> None:
+        """Submits a `job` for `key`. It supersedes the previous job for the same `key` if any."""
+        with self._cond:
+            token = self._tokens[key] = next(self._token_counter)
+            self.stats.submitted += 1
+            if key in self._pending or key in self._running:
+                self.stats.superseded += 1
+            if key not in self._pending:
+                self._queue.append(key)
+            self._pending[key] = _PendingJob(job, token)
+            self.stats.queue_depth_max = max(self.stats.queue_depth_max, len(self._queue))
+            self._ensure_workers()
+            self._cond.notify()
+
+    def is_worker_thread(self) -> bool:
+        """Whether the current thread is a worker of this pool."""
+        return threading.current_thread() in self._workers
+
+    def shutdown(self) -> None:
+        """Drops pending jobs and stops workers after their current jobs."""
+        with self._cond:
+            self._generation += 1
+            for key in self._pending:
+                if key not in self._running:
+                    self._tokens.pop(key, None)
+            self._queue.clear()
+            self._pending.clear()
+            self._workers.clear()
+            self._cond.notify_all()
+
+    def _is_superseded(self, key: Hashable, token: int) -> bool:
+        # a token is forgotten when its job is finished and there is no newer job
+        return self._tokens.get(key, token) != token
+
+    def _ensure_workers(self) -> None:
+        # should be called with `self._cond` held
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < min(self.max_workers, len(self._queue)):
+            worker = threading.Thread(
+                target=self._work,
+                args=(self._generation,),
+                name=f"{self.name}-{len(self._workers)}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self, generation: int) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and self._generation == generation:
+                    self._cond.wait()
+                if self._generation != generation:
+                    return
+                key = self._queue.popleft()
+                pending = self._pending.pop(key)
+                self._running[key] += 1
+
+            started_at = time.perf_counter()
+            failed = False
+            try:
+                pending.job(partial(self._is_superseded, key, pending.token))
+            except Exception as e:
+                failed = True
+                print(f"[{PLUGIN_NAME}][ERROR] Failed running a job: {e}")
+            finished_at = time.perf_counter()
+
+            with self._cond:
+                if (running := self._running[key] - 1) > 0:
+                    self._running[key] = running
+                else:
+                    del self._running[key]
+                if self._tokens.get(key) == pending.token and key not in self._pending:
+                    self._tokens.pop(key, None)
+                wait_ms = (started_at - pending.submitted_at) * 1000
+                run_ms = (finished_at - started_at) * 1000
+                stats = self.stats
+                stats.completed += 1
+                stats.failed += failed
+                stats.wait_ms_total += wait_ms
+                stats.wait_ms_max = max(stats.wait_ms_max, wait_ms)
+                stats.run_ms_total += run_ms
+                stats.run_ms_max = max(stats.run_ms_max, run_ms)
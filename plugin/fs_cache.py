@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import stat
+import threading
+import time
+from collections.abc import Generator, Iterable
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple, Union
+
+from .cache import LruCache
+
+StrPath = Union[str, "os.PathLike[str]"]
+
+_ProbeEntry = Tuple[float, Optional[int]]
+"""`(expire_at, st_mode)` where `st_mode` is `None` if the path doesn't exist."""
+_MarkerEntry = Tuple[float, FrozenSet[str], Dict[str, int]]
+"""`(expire_at, probed_markers, {found_marker: st_mode})`"""
+
+
+class FsProbeCache:
+    """
+    Caches `os.stat()` results of paths for a while, including those which don't exist.
+
+    Filesystem-touching constraints probe the same paths, like `.git` in every ancestor directory,
+    again and again. Each probe may take milliseconds on a network drive. With this cache,
+    a path is probed at most once during `ttl_s` seconds, no matter it exists or not.
+    """
+
+    def __init__(self, ttl_s: float = 3.0, maxsize: int = 4096) -> None:
+        self.ttl_s = ttl_s
+        """The time (in seconds) a probe result lives. Non-positive means no caching."""
+        self._cache: LruCache[str, _ProbeEntry] = LruCache(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def maxsize(self) -> int:
+        return self._cache.maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int) -> None:
+        self._cache.maxsize = max(0, value)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stat_mode(self, path: StrPath) -> int | None:
+        """Returns the `st_mode` of `path`, following symlinks. `None` if it doesn't exist."""
+        key = os.fspath(path)
+        now = time.monotonic()
+        if (entry := self._cache.get(key)) and entry[0] > now:
+            return entry[1]
+
+        try:
+            mode: int | None = os.stat(key).st_mode
+        except (OSError, ValueError):
+            mode = None
+        if self.ttl_s > 0 and self.maxsize > 0:
+            self._cache.set(key, (now + self.ttl_s, mode))
+        return mode
+
+    def exists(self, path: StrPath) -> bool:
+        """Same with `Path.exists()` but cached."""
+        return self.stat_mode(path) is not None
+
+    def is_dir(self, path: StrPath) -> bool:
+        """Same with `Path.is_dir()` but cached."""
+        return (mode := self.stat_mode(path)) is not None and stat.S_ISDIR(mode)
+
+    def is_file(self, path: StrPath) -> bool:
+        """Same with `Path.is_file()` but cached."""
+        return (mode := self.stat_mode(path)) is not None and stat.S_ISREG(mode)
+
+
+class ProjectMarkerIndex:
+    """
+    Knows which project markers, like `.git` and `manage.py`, each directory has.
+
+    When a directory is firstly asked, every registered marker is probed in it at once.
+    Results are memoized per directory, so that asking for another marker or for a sibling file
+    doesn't probe the directory again. A single upward walk answers all project constraints.
+    """
+
+    def __init__(self, probes: FsProbeCache, maxsize: int = 1024) -> None:
+        self.probes = probes
+        """Probes are done via this cache, whose TTL is also used for memoized directories."""
+        self.markers: frozenset[str] = frozenset()
+        """Registered markers, which are relative paths without trailing slashes."""
+        self._dirs: LruCache[str, _MarkerEntry] = LruCache(maxsize)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._dirs)
+
+    def clear(self) -> None:
+        self._dirs.clear()
+
+    def register(self, markers: Iterable[str]) -> None:
+        """Registers `markers` so that they are probed together with others."""
+        with self._lock:
+            self.markers = self.markers.union(map(_normalize_marker, markers))
+
+    def markers_of(self, directory: Path, markers: frozenset[str] | None = None) -> dict[str, int]:
+        """Returns `{marker: st_mode}` of `markers` (registered ones by default) which exist in `directory`."""
+        key = str(directory)
+        now = time.monotonic()
+        markers = self.markers if markers is None else markers
+        if (entry := self._dirs.get(key)) and entry[0] > now and markers <= entry[1]:
+            return entry[2]
+
+        found = {marker: mode for marker in markers if (mode := self.probes.stat_mode(directory / marker)) is not None}
+        if self.probes.ttl_s > 0:
+            self._dirs.set(key, (now + self.probes.ttl_s, markers, found))
+        return found
+
+    def iter_parents_with_marker(
+        self,
+        base: str | Path,
+        marker: str,
+        *,
+        use_exists: bool = False,
+    ) -> Generator[Path, None, None]:
+        """
+        Yields parent directories of `base`, from the nearest one, which have `marker`.
+        A `marker` with a trailing slash must be a directory. Otherwise, it must be a file unless `use_exists`.
+        """
+        if (name := _normalize_marker(marker)) not in self.markers:
+            self.register((name,))
+
+        if use_exists:
+            checker = None
+        elif marker.endswith(("\\", "/")):
+            checker = stat.S_ISDIR
+        else:
+            checker = stat.S_ISREG
+
+        # without memoization, probing other markers is just a waste
+        markers = None if self.probes.ttl_s > 0 else frozenset((name,))
+        for parent in Path(base).parents:
+            if (mode := self.markers_of(parent, markers).get(name)) is not None and (not checker or checker(mode)):
+                yield parent
+
+
+def _normalize_marker(marker: str) -> str:
+    return marker.rstrip("\\/")
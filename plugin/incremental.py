@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import sublime
+
+from .snapshot import ViewSnapshot
+from .types import SnapshotInput
+
+
+@dataclass
+class ConstraintMemo:
+    """Results of constraint rules for a buffer from the last run, which may be re-used by the next run."""
+
+    generation: int
+    """The generation of the `SyntaxRuleCollection` which produces these results."""
+    file_name: str
+    syntax: sublime.Syntax | None
+    results: dict[int, tuple[bool, SnapshotInput]] = field(default_factory=dict)
+    dirty: SnapshotInput = SnapshotInput.NONE
+    """Inputs which have been changed since the last run."""
+
+    def is_valid_for(self, view: sublime.View, generation: int) -> bool:
+        return (
+            self.generation == generation
+            and self.file_name == (view.file_name() or "")
+            and self.syntax == view.syntax()
+        )
+
+    def carry_over(self) -> dict[int, tuple[bool, SnapshotInput]]:
+        """Returns results whose inputs have not been changed."""
+        changed = self.dirty | SnapshotInput.UNKNOWN
+        return {key: item for key, item in self.results.items() if not (item[1] & changed)}
+
+    @classmethod
+    def from_snapshot(cls, view_snapshot: ViewSnapshot, generation: int) -> ConstraintMemo:
+        return cls(
+            generation=generation,
+            file_name=view_snapshot.view.file_name() or "",
+            syntax=view_snapshot.syntax,
+            results=dict(view_snapshot.constraint_results or {}),
+        )
+
+
+def changed_snapshot_inputs(
+    view: sublime.View,
+    changes: Sequence[sublime.TextChange],
+    trim_file_size: int,
+) -> SnapshotInput:
+    """Works out which `ViewSnapshot` inputs are changed by `changes`, which have just been applied to `view`."""
+    changed = SnapshotInput.NONE
+    half = trim_file_size // 2
+    size_after = view.size()
+    # changes are applied in order so we walk them backward to know the buffer size around each of them
+    for change in reversed(changes):
+        removed = change.b.pt - change.a.pt
+        size_before = size_after - len(change.str) + removed
+
+        if change.a.row == 0:
+            changed |= SnapshotInput.FIRST_LINE
+        if change.a.row != change.b.row or "\n" in change.str:
+            changed |= SnapshotInput.LINE_COUNT
+        if (
+            # the content is the whole buffer
+            min(size_before, size_after) <= trim_file_size
+            # the change touches the head
+            or change.a.pt < half
+            # the change touches the tail
+            or change.b.pt > size_before - half
+        ):
+            changed |= SnapshotInput.CONTENT
+
+        size_after = size_before
+    return changed
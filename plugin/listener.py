@@ -11,12 +11,14 @@ import sublime_plugin
 from .commands.auto_set_syntax import run_auto_set_syntax_on_view
 from .constants import PLUGIN_NAME, PY_VERSION, ST_CHANNEL, ST_PLATFORM_ARCH, ST_VERSION, VERSION, VIEW_KEY_IS_TRANSIENT
 from .helpers import is_syntaxable_view
+from .incremental import changed_snapshot_inputs
 from .logger import Logger
+from .persistent_cache import make_settings_hash
 from .rules import SyntaxRuleCollection, get_constraints, get_matches
-from .settings import get_merged_plugin_setting, pref_syntax_rules
+from .settings import get_merged_plugin_setting, get_merged_plugin_settings, pref_syntax_rules
 from .shared import G
-from .types import ListenerEvent
-from .utils import debounce, is_transient_view, stringify
+from .types import ListenerEvent, SnapshotInput
+from .utils import Debouncer, is_transient_view, stringify
 
 _T_Callable = TypeVar("_T_Callable", bound=Callable[..., Any])
 
@@ -34,6 +36,8 @@ def set_up_window(window: sublime.Window) -> None:
 def tear_down_window(window: sublime.Window) -> None:
     G.syntax_rule_collections.pop(window, None)
     G.dropped_rules_collection.pop(window, None)
+    G.syntax_decision_caches.pop(window, None)
+    _retain_profiled_rules()
     Logger.log("👋 Bye!", window=window)
     Logger.destroy(window=window)
 
@@ -52,13 +56,24 @@ def compile_rules(window: sublime.Window, *, is_update: bool = False) -> None:
     Logger.log(f'🔍 Found "Constraint" implementations: {names_as_str(get_constraints())}', window=window)
 
     syntax_rule_collection = SyntaxRuleCollection.make(pref_syntax_rules(window=window))
+    syntax_rule_collection.settings_hash = make_settings_hash(get_merged_plugin_settings(window=window))
     G.syntax_rule_collections[window] = syntax_rule_collection
-    Logger.log(f"📜 Compiled syntax rule collection: {stringify(syntax_rule_collection)}", window=window)
+    Logger.log(lambda: f"📜 Compiled syntax rule collection: {stringify(syntax_rule_collection)}", window=window)
+    Logger.log(
+        f"🧬 Interned constraints: {syntax_rule_collection.merged_constraint_count} duplicates are merged",
+        window=window,
+    )
 
     dropped_rules = list(syntax_rule_collection.optimize())
     G.dropped_rules_collection[window] = dropped_rules
-    Logger.log(f"✨ Optimized syntax rule collection: {stringify(syntax_rule_collection)}", window=window)
-    Logger.log(f"💀 Dropped rules during optimizing: {stringify(dropped_rules)}", window=window)
+    Logger.log(lambda: f"✨ Optimized syntax rule collection: {stringify(syntax_rule_collection)}", window=window)
+    Logger.log(lambda: f"💀 Dropped rules during optimizing: {stringify(dropped_rules)}", window=window)
+
+    index = syntax_rule_collection.compile()
+    Logger.log(
+        f"🗂️ Built decision index: {index.guarded_count} of {len(index)} rules are indexed by file name", window=window
+    )
+    _retain_profiled_rules()
 
     Logger.log(
         f"# {Logger.DELIMITER} re-compile rules for {window} {Logger.DELIMITER} END",
@@ -67,13 +82,23 @@ def compile_rules(window: sublime.Window, *, is_update: bool = False) -> None:
     )
 
 
+def _retain_profiled_rules() -> None:
+    """Drops profiled stats of rules which are not compiled for any window anymore, so that they can be freed."""
+    if G.rule_profiler.stats:
+        G.rule_profiler.retain(
+            rule for collection in G.syntax_rule_collections.values() for rule in collection.iter_rules()
+        )
+
+
 def _configured_debounce(func: _T_Callable) -> _T_Callable:
-    """Debounce a function so that it's called once in seconds."""
+    """Debounce a function, whose first argument is a view, per buffer so that it's called once in seconds."""
+    debouncer = Debouncer()
 
-    def debounced(*args: Any, **kwargs: Any) -> Any:
-        if (time_s := get_merged_plugin_setting("debounce", 0)) > 0:
-            return debounce(time_s)(func)(*args, **kwargs)
-        return func(*args, **kwargs)
+    @wraps(func)
+    def debounced(view: sublime.View, *args: Any, **kwargs: Any) -> Any:
+        if (time_s := get_merged_plugin_setting("debounce", 0, window=view.window())) > 0:
+            return debouncer.call(view.buffer_id(), time_s, func, view, *args, **kwargs)
+        return func(view, *args, **kwargs)
 
     return cast(_T_Callable, debounced)
 
@@ -102,6 +127,9 @@ class AutoSetSyntaxTextChangeListener(sublime_plugin.TextChangeListener):
 
     @_guarantee_primary_view(must_plaintext=True)
     def on_text_changed_async(self, view: sublime.View, changes: list[sublime.TextChange]) -> None:
+        if (memo := G.constraint_memos.get(view.buffer_id())) and changes:
+            trim_file_size = get_merged_plugin_setting("trim_file_size", window=view.window())
+            memo.dirty |= changed_snapshot_inputs(view, changes, trim_file_size)
         _try_assign_syntax_when_text_changed(view, changes)
 
 
@@ -139,6 +167,9 @@ class AutoSetSyntaxEventListener(sublime_plugin.EventListener):
     def on_post_window_command(self, window: sublime.Window, command_name: str, args: dict[str, Any]) -> None:
         if command_name in ("build", "exec") and (view := window.find_output_panel("exec")):
             run_auto_set_syntax_on_view(view, ListenerEvent.EXEC)
+        # messages are buffered while the log panel is hidden
+        if command_name == "show_panel" and args.get("panel") == f"output.{PLUGIN_NAME}":
+            Logger.flush(window=window)
 
 
 @_configured_debounce
@@ -149,7 +180,22 @@ def _try_assign_syntax_when_text_changed(view: sublime.View, changes: Sequence[s
         return False
 
     # paste = added change is too large
-    if sum(len(change.str) for change in changes) >= 8:
+    is_paste = sum(len(change.str) for change in changes) >= 8
+
+    if get_merged_plugin_setting("incremental_detection", window=view.window()):
+        # nothing which rules depend on has been changed
+        if (
+            (memo := G.constraint_memos.get(view.buffer_id()))
+            and (window := view.window())
+            and (syntax_rule_collection := G.syntax_rule_collections.get(window))
+            and memo.is_valid_for(view, syntax_rule_collection.generation)
+            and not memo.dirty & SnapshotInput.TEXT
+        ):
+            return False
+        event = ListenerEvent.PASTE if is_paste else ListenerEvent.MODIFY
+        return run_auto_set_syntax_on_view(view, event, must_plaintext=True, incremental=True)
+
+    if is_paste:
         return run_auto_set_syntax_on_view(view, ListenerEvent.PASTE, must_plaintext=True)
 
     historic_position = changes[0].b
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import math
 import re
+import threading
+from collections import deque
 from contextlib import contextmanager
-from typing import Any, Final, Generator
+from typing import Any, Callable, Final, Generator, Union
 
 import sublime
 import sublime_plugin
@@ -27,6 +29,13 @@ def _find_log_panel(obj: Any) -> sublime.View | None:
     return (resolve_window(obj) or sublime.active_window()).find_output_panel(PLUGIN_NAME)
 
 
+def _squash_log_line(line: str, msg: str, times: int) -> str | None:
+    """Squashes `msg` repeated `times` times into `line`, like `msg (x2)`. `None` if `line` isn't for `msg`."""
+    if line.startswith(msg) and (m := re.fullmatch(r"(?: +\(x(\d+)\))?", line[len(msg) :])):
+        return f"{msg} (x{int(m.group(1) or 1) + times})"
+    return None
+
+
 def _create_log_panel(window: sublime.Window) -> sublime.View:
     panel = window.create_output_panel(PLUGIN_NAME)
     # Somehow there is an error about "scope:output.autosetsyntax.log" not found during updating this plugin.
@@ -47,25 +56,73 @@ def _create_log_panel(window: sublime.Window) -> sublime.View:
     return panel
 
 
+LogMessage = Union[str, Callable[[], str]]
+"""A message, or a callable which makes the message. The callable is only called when logging is enabled."""
+
+
 class Logger:
     DELIMITER: Final[str] = "-" * 10
     SYNTAX_FILE: Final[str] = f"Packages/{PLUGIN_NAME}/syntaxes/AutoSetSyntaxLog.sublime-syntax"
+    BUFFER_SIZE: Final[int] = 1000
+    """The max amount of buffered (squashed) messages per window. Older ones are dropped."""
 
     history_counts: dict[int, int] = {}
     """per-window, WindowId => history count"""
+    buffers: dict[int, deque[list[Any]]] = {}
+    """per-window, WindowId => `[msg, repeated_times]` which are not written into the panel yet"""
+
+    _scheduled_flushes: set[int] = set()
+    """WindowIds whose flush has been scheduled"""
+    _lock = threading.Lock()
 
     @classmethod
-    def log(cls, msg: str, *, window: sublime.Window | None = None, enabled: bool = True) -> None:
+    def log(cls, msg: LogMessage, *, window: sublime.Window | None = None, enabled: bool = True) -> None:
+        """
+        Buffers `msg`, which is written into the log panel in the next tick if the panel is visible.
+        Otherwise, it's written when the panel is shown via `Logger.flush()`.
+        """
         window = window or sublime.active_window()
         if not (enabled and get_merged_plugin_setting("enable_log", window=window)):
             return
 
+        if callable(msg):
+            msg = msg()
+
+        with cls._lock:
+            if (buffer := cls.buffers.get(window_id := window.id())) is None:
+                buffer = cls.buffers[window_id] = deque(maxlen=cls.BUFFER_SIZE)
+            if buffer and buffer[-1][0] == msg:
+                buffer[-1][1] += 1
+            else:
+                buffer.append([msg, 1])
+            if is_scheduled := window_id not in cls._scheduled_flushes:
+                cls._scheduled_flushes.add(window_id)
+
+        if is_scheduled:
+            sublime.set_timeout(lambda: cls.flush(window=window))
+
+    @classmethod
+    def flush(cls, *, window: sublime.Window | None = None) -> None:
+        """Writes buffered messages into the log panel by a single edit, if the panel is visible."""
+        window = window or sublime.active_window()
+        with cls._lock:
+            cls._scheduled_flushes.discard(window_id := window.id())
+            if not ((buffer := cls.buffers.get(window_id)) and window.is_valid()):
+                return
+            # the panel has to exist so that it can be shown by users
+            if not _find_log_panel(window):
+                _create_log_panel(window)
+            if window.active_panel() != f"output.{PLUGIN_NAME}":
+                return
+            entries = list(map(tuple, buffer))
+            buffer.clear()
+
         max_lines = get_st_setting("console_max_history_lines", math.inf) / 8
-        if cls._get_history_count(window) >= max_lines:
+        if cls._get_history_count(window) + len(entries) >= max_lines:
             cls.clear(window=window)
 
-        window.run_command("auto_set_syntax_append_log", {"msg": msg})
-        cls._increase_history_count(window)
+        window.run_command("auto_set_syntax_append_log", {"entries": entries})
+        cls._increase_history_count(window, len(entries))
         cls._clear_undo_stack(window)
 
     @classmethod
@@ -80,6 +137,7 @@ class Logger:
         window = window or sublime.active_window()
         window.destroy_output_panel(PLUGIN_NAME)
         cls.history_counts.pop(window.id(), None)
+        cls.buffers.pop(window.id(), None)
 
     @classmethod
     def _get_history_count(cls, window: sublime.Window) -> int:
@@ -116,22 +174,32 @@ class AutoSetSyntaxAppendLogCommand(sublime_plugin.WindowCommand):
     def is_visible(self) -> bool:
         return False
 
-    def run(self, msg: str, squash_history: bool = True) -> None:
+    def run(self, entries: list[tuple[str, int]], squash_history: bool = True) -> None:
+        """`entries` are `(msg, repeated_times)` to be appended."""
         if not (panel := _find_log_panel(self.window)):
             panel = _create_log_panel(self.window)
 
-        if (
-            squash_history
-            and (last_line_region := panel.full_line(panel.size() - 1))
-            and (last_line := panel.substr(last_line_region).rstrip()).startswith(msg)
-            and (m := re.match(r"(?: +\(x(\d+)\))?", last_line[len(msg) :]))
-        ):
-            msg = f"{msg} (x{int(m.group(1) or 1) + 1})"
-            replace_region = last_line_region
-        else:
-            replace_region = sublime.Region(panel.size())  # EOF
-
-        panel.run_command("auto_set_syntax_update_log", {"region": replace_region.to_tuple(), "msg": f"{msg}\n"})
+        replace_region = sublime.Region(panel.size())  # EOF
+        lines: list[str] = []
+        for msg, times in entries:
+            if squash_history:
+                if lines:
+                    if squashed := _squash_log_line(lines[-1], msg, times):
+                        lines[-1] = squashed
+                        continue
+                elif (last_line_region := panel.full_line(panel.size() - 1)) and (
+                    squashed := _squash_log_line(panel.substr(last_line_region).rstrip(), msg, times)
+                ):
+                    lines.append(squashed)
+                    replace_region = last_line_region
+                    continue
+            lines.append(f"{msg} (x{times})" if times > 1 else msg)
+
+        if lines:
+            panel.run_command(
+                "auto_set_syntax_update_log",
+                {"region": replace_region.to_tuple(), "msg": "".join(f"{line}\n" for line in lines)},
+            )
 
 
 class AutoSetSyntaxClearLogPanelCommand(sublime_plugin.WindowCommand):
@@ -164,3 +232,4 @@ class AutoSetSyntaxToggleLogPanelCommand(sublime_plugin.WindowCommand):
 
     def run(self) -> None:
         self.window.run_command("show_panel", {"panel": f"output.{PLUGIN_NAME}", "toggle": True})
+        Logger.flush(window=self.window)
@@ -0,0 +1,447 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from itertools import count
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Hashable, TypeVar, Union
+
+from .cache import LruCache
+from .constants import PLUGIN_NAME, PLUGIN_PY_LIBS_DIR, ST_PLATFORM
+from .persistent_cache import PersistentLruCache
+
+if TYPE_CHECKING:
+    from magika import Magika
+    from magika.types import MagikaResult
+
+_T = TypeVar("_T")
+
+MagikaSample = Union[Path, bytes]
+"""A file path or a content sample to be predicted."""
+
+_FILE_HASH_WINDOW = 64 * 1024
+"""The max amount of bytes hashed from each of the head and the tail of a file sample."""
+
+
+class MagikaWorkerError(Exception):
+    """Raised when the Magika worker subprocess fails or times out."""
+
+
+class MagikaSession:
+    """
+    Holds a process-wide `Magika` object, so that its model is loaded once rather than per prediction.
+
+    The model is loaded on the first use, which may raise `ImportError` if Magika is not installed.
+    Predictions are serialized by a lock so that the object can be shared by worker threads.
+    """
+
+    def __init__(self) -> None:
+        self._magika: Magika | None = None
+        self._model_name = ""
+        self._lock = threading.RLock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._magika is not None
+
+    def get(self) -> Magika:
+        """Gets the `Magika` object. It's created if not yet."""
+        with self._lock:
+            if self._magika is None:
+                from magika import Magika
+
+                self._magika = Magika()
+            return self._magika
+
+    @property
+    def model_name(self) -> str:
+        """The name of the model, which is known without loading the model."""
+        if not self._model_name:
+            from magika import Magika
+
+            self._model_name = Magika.get_default_model_name()
+        return self._model_name
+
+    def release(self) -> None:
+        """Releases the `Magika` object so that its model can be freed. It's re-created when needed."""
+        with self._lock:
+            self._magika = None
+
+    def identify_bytes(self, content: bytes) -> MagikaResult:
+        with self._lock:
+            return self.get().identify_bytes(content)
+
+    def identify_paths(self, paths: list[Path]) -> list[MagikaResult]:
+        with self._lock:
+            return self.get().identify_paths(paths) if paths else []
+
+    def predict_paths(self, paths: list[Path]) -> list[MagikaPrediction]:
+        return list(map(MagikaPrediction.from_result, self.identify_paths(paths)))
+
+    def predict_samples(self, samples: Sequence[MagikaSample]) -> list[MagikaPrediction]:
+        """Predicts paths in `samples` by a single batched call. Contents are predicted in memory."""
+        with self._lock:
+            path_results = iter(self.identify_paths([sample for sample in samples if isinstance(sample, Path)]))
+            return [
+                MagikaPrediction.from_result(
+                    self.identify_bytes(sample) if isinstance(sample, bytes) else next(path_results)
+                )
+                for sample in samples
+            ]
+
+
+class MagikaSubprocessSession:
+    """
+    Runs Magika in a long-lived subprocess, so that inference doesn't contend for the GIL of the plugin host.
+
+    The subprocess is `python` running `magika_worker.py` with `PLUGIN_PY_LIBS_DIR` as `PYTHONPATH`.
+    Requests are pipelined over stdin/stdout and each of them waits for at most `timeout_s` seconds.
+    The subprocess is (re)started when needed, like after it exits or times out.
+    """
+
+    RESTART_DELAY_S = 5.0
+    """The min time (in seconds) between two starts, so that a broken interpreter won't be started repeatedly."""
+
+    def __init__(self, python: str, *, timeout_s: float = 10.0) -> None:
+        self.python = python
+        self.timeout_s = timeout_s
+        self._process: subprocess.Popen[str] | None = None
+        self._model_name: Future[str] = Future()
+        self._last_model_name = ""
+        self._futures: dict[int, Future[list[MagikaPrediction]]] = {}
+        self._request_ids = count(1)
+        self._started_at = float("-inf")
+        self._lock = threading.RLock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._process and self._process.poll() is None)
+
+    @property
+    def model_name(self) -> str:
+        """
+        The name of the model, which is told by the subprocess once the model is loaded.
+        It's remembered after the subprocess stops. Empty string if the subprocess has never told it.
+        """
+        return self._last_model_name
+
+    def release(self) -> None:
+        """Stops the subprocess. It's restarted when needed."""
+        with self._lock:
+            if process := self._process:
+                self._release_process(process)
+
+    def predict_paths(self, paths: list[Path]) -> list[MagikaPrediction]:
+        future: Future[list[MagikaPrediction]] = Future()
+        # the subprocess must not be restarted by others before the request is sent
+        with self._lock:
+            process, _ = self._ensure_started()
+            request_id = next(self._request_ids)
+            self._futures[request_id] = future
+            try:
+                assert process.stdin
+                process.stdin.write(json.dumps({"id": request_id, "paths": list(map(str, paths))}) + "\n")
+                process.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._futures.pop(request_id, None)
+                self._release_process(process)
+                raise MagikaWorkerError(f"Failed sending request: {e}") from e
+        return self._wait(future, process)
+
+    def _release_process(self, process: subprocess.Popen[str]) -> None:
+        """Stops `process`. It's forgotten only if it's still the current one, which may have been restarted."""
+        with self._lock:
+            if self._process is process:
+                self._process = None
+        process.kill()
+
+    def _wait(self, future: Future[_T], process: subprocess.Popen[str]) -> _T:
+        try:
+            return future.result(self.timeout_s)
+        except FutureTimeoutError:
+            # a stuck subprocess may never respond, so start a new one for following requests
+            self._release_process(process)
+            raise MagikaWorkerError(f"Timed out after {self.timeout_s} seconds")
+
+    def _ensure_started(self) -> tuple[subprocess.Popen[str], Future[str]]:
+        with self._lock:
+            if self._process and self._process.poll() is None:
+                return (self._process, self._model_name)
+            if (now := time.monotonic()) - self._started_at < self.RESTART_DELAY_S and self._model_name.done():
+                # the last one just failed
+                self._model_name.result()
+            self._started_at = now
+
+            from . import magika_worker
+
+            try:
+                process = subprocess.Popen(
+                    (self.python, "-u", "-c", inspect.getsource(magika_worker)),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    env={**os.environ, "PYTHONPATH": str(PLUGIN_PY_LIBS_DIR)},
+                    encoding="utf-8",
+                    creationflags=subprocess.CREATE_NO_WINDOW if ST_PLATFORM == "windows" else 0,  # type: ignore
+                )
+            except OSError as e:
+                self._model_name = Future()
+                self._model_name.set_exception(MagikaWorkerError(f"Failed starting {self.python}: {e}"))
+                raise MagikaWorkerError(f"Failed starting {self.python}: {e}") from e
+
+            self._process = process
+            self._model_name = Future()
+            self._futures = {}
+            threading.Thread(
+                target=self._read_responses,
+                args=(process, self._model_name, self._futures),
+                name=f"{PLUGIN_NAME}-magika-worker-reader",
+                daemon=True,
+            ).start()
+            return (process, self._model_name)
+
+    def _read_responses(
+        self,
+        process: subprocess.Popen[str],
+        model_name: Future[str],
+        futures: dict[int, Future[list[MagikaPrediction]]],
+    ) -> None:
+        assert process.stdout
+        fatal_error = ""
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+                request_id = int(response["id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            future: Future[Any] | None
+            if request_id == 0 and model_name.done():
+                # the subprocess can't tell which request fails, and it exits right after
+                fatal_error = str(response.get("error", ""))
+                continue
+            if request_id == 0:
+                future = model_name
+            else:
+                with self._lock:
+                    future = futures.pop(request_id, None)
+            if not future or future.done():
+                continue
+            if "error" in response:
+                future.set_exception(MagikaWorkerError(response["error"]))
+                continue
+            result: Any
+            try:
+                if request_id == 0:
+                    result = self._last_model_name = str(response["model_name"])
+                else:
+                    result = [MagikaPrediction(str(label), float(score)) for label, score in response["predictions"]]
+            except (KeyError, TypeError, ValueError) as e:
+                future.set_exception(MagikaWorkerError(f"Invalid response: {e}"))
+                continue
+            future.set_result(result)
+
+        # the subprocess has exited
+        error = MagikaWorkerError(fatal_error or f"Magika worker exited with code {process.wait()}")
+        if not model_name.done():
+            model_name.set_exception(error)
+        with self._lock:
+            pending = list(futures.values())
+            futures.clear()
+        for prediction_future in pending:
+            if not prediction_future.done():
+                prediction_future.set_exception(error)
+
+
+@dataclass
+class MagikaPrediction:
+    """The part of a Magika result which is used by this plugin."""
+
+    label: str
+    score: float
+
+    @classmethod
+    def from_result(cls, result: MagikaResult) -> MagikaPrediction:
+        return cls(result.output.ct_label, result.output.score)
+
+
+class MagikaPredictionCache(PersistentLruCache[str, MagikaPrediction]):
+    """An LRU cache of Magika predictions, keyed by the model name and the hash of the predicted bytes."""
+
+    def __init__(self, path: Path, maxsize: int = 1000) -> None:
+        super().__init__(path, maxsize)
+        self.is_persistent = False
+        """Whether this cache is saved to the disk."""
+
+    def get(self, key: str) -> MagikaPrediction | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, prediction: MagikaPrediction) -> None:
+        self._set(key, prediction, save=self.is_persistent)
+
+    def _dump_item(self, key: str, value: MagikaPrediction) -> Any:
+        return (key, value.label, value.score)
+
+    def _load_item(self, obj: Any) -> tuple[str, MagikaPrediction]:
+        key, label, score = obj
+        return (str(key), MagikaPrediction(str(label), float(score)))
+
+
+@dataclass
+class _PendingPrediction:
+    sample: MagikaSample
+    future: Future[MagikaPrediction] = field(default_factory=Future)
+
+
+class MagikaBatcher:
+    """
+    Predicts multiple samples by a single batched Magika call.
+
+    Predictions requested by batching threads, like those of a worker pool, within `window_s` seconds
+    are collected into one batch. Other threads predict immediately since nobody else would join their batches.
+    Predictions can also be prefetched in batch, like for views which exist when ST starts up.
+    The worker subprocess only takes paths, so content samples are written into temporary files for it.
+
+    Predictions are cached by hashes of samples, so an unchanged sample is never predicted twice.
+    """
+
+    def __init__(
+        self,
+        session: MagikaSession | MagikaSubprocessSession,
+        cache: MagikaPredictionCache,
+        window_s: float = 0.03,
+        *,
+        is_batching_thread: Callable[[], bool] = lambda: False,
+    ) -> None:
+        self.session = session
+        """Where predictions are done, which may be swapped by settings."""
+        self.cache = cache
+        self.window_s = window_s
+        """The time (in seconds) to wait for more predictions to be requested."""
+        self.is_batching_thread = is_batching_thread
+        """Whether predictions requested by the current thread should be collected into batches."""
+        self.batch_count = 0
+        """The amount of batched calls, for debugging."""
+        self._pending: list[_PendingPrediction] = []
+        self._is_collecting = False
+        self._lock = threading.Lock()
+        self._prefetched: LruCache[Hashable, MagikaPrediction] = LruCache(256)
+
+    def predict(self, sample: MagikaSample) -> MagikaPrediction:
+        """Predicts `sample`, together with others which are requested at the same time."""
+        if (prediction := self._prefetched.pop(_sample_key(sample))) is not None:
+            return prediction
+        digest = self._digest_sample(sample)
+        if (cache_key := self._make_cache_key(digest)) and (prediction := self.cache.get(cache_key)):
+            return prediction
+
+        pending = _PendingPrediction(sample)
+        if not self.is_batching_thread():
+            # others, like the main thread and ST's async thread, have nobody to wait for so predict immediately,
+            # but they may still wait for a running prediction since predictions of a session are serialized
+            self._run_batch([pending])
+        else:
+            with self._lock:
+                self._pending.append(pending)
+                if is_leader := not self._is_collecting:
+                    self._is_collecting = True
+            if is_leader:
+                time.sleep(self.window_s)
+                with self._lock:
+                    batch, self._pending = self._pending, []
+                    self._is_collecting = False
+                self._run_batch(batch)
+
+        prediction = pending.future.result()
+        # the model name of the worker subprocess may be known only after predicting
+        if cache_key := cache_key or self._make_cache_key(digest):
+            self.cache.set(cache_key, prediction)
+        return prediction
+
+    def prefetch(self, samples: Sequence[MagikaSample]) -> None:
+        """Predicts `samples` in batch. Results are used by `predict()` later."""
+        digests: dict[MagikaSample, str] = {}
+        for sample in samples:
+            digest = digests[sample] = self._digest_sample(sample)
+            if (cache_key := self._make_cache_key(digest)) and self.cache.get(cache_key):
+                del digests[sample]
+        if not (samples := list(digests)):
+            return
+        for sample, prediction in zip(samples, self.predict_many(samples)):
+            self._prefetched.set(_sample_key(sample), prediction)
+            if cache_key := self._make_cache_key(digests[sample]):
+                self.cache.set(cache_key, prediction)
+
+    def predict_many(self, samples: Sequence[MagikaSample]) -> list[MagikaPrediction]:
+        """Predicts `samples` by a single batched call."""
+        self.batch_count += 1
+        if isinstance(session := self.session, MagikaSession):
+            return session.predict_samples(samples)
+        if len(paths := [sample for sample in samples if isinstance(sample, Path)]) == len(samples):
+            return session.predict_paths(paths)
+
+        with tempfile.TemporaryDirectory(prefix=f"{PLUGIN_NAME}-") as tmp_dir:
+            paths.clear()
+            for idx, sample in enumerate(samples):
+                if isinstance(sample, bytes):
+                    (path := Path(tmp_dir, str(idx))).write_bytes(sample)
+                    sample = path
+                paths.append(sample)
+            return session.predict_paths(paths)
+
+    def _digest_sample(self, sample: MagikaSample) -> str:
+        """Hashes `sample` for making its cache key. Empty string if it shouldn't be cached."""
+        return _hash_sample(sample) if self.cache.maxsize > 0 else ""
+
+    def _make_cache_key(self, digest: str) -> str:
+        """Makes the cache key from the digest of a sample. Empty string if the model name is not yet known."""
+        if not (digest and (model_name := self.session.model_name)):
+            return ""
+        return f"{model_name}:{digest}"
+
+    def _run_batch(self, batch: list[_PendingPrediction]) -> None:
+        try:
+            predictions = self.predict_many([pending.sample for pending in batch])
+        except Exception as e:
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+        for pending, prediction in zip(batch, predictions):
+            pending.future.set_result(prediction)
+
+
+def _hash_sample(sample: MagikaSample) -> str:
+    """
+    Hashes bytes of `sample`. Empty string if the file can't be read.
+
+    A file is hashed by its size, its modified time and at most `_FILE_HASH_WINDOW` bytes of its head and tail,
+    so that a huge file is not read entirely, while Magika only reads blocks of the head and tail of it either.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    if isinstance(sample, bytes):
+        hasher.update(sample)
+        return hasher.hexdigest()
+    try:
+        with sample.open("rb") as f:
+            st = os.fstat(f.fileno())
+            hasher.update(f"file:{st.st_size}:{st.st_mtime_ns}:".encode())
+            hasher.update(f.read(_FILE_HASH_WINDOW))
+            if st.st_size > _FILE_HASH_WINDOW:
+                f.seek(max(_FILE_HASH_WINDOW, st.st_size - _FILE_HASH_WINDOW))
+                hasher.update(f.read(_FILE_HASH_WINDOW))
+    except OSError:
+        return ""
+    return hasher.hexdigest()
+
+
+def _sample_key(sample: MagikaSample) -> Hashable:
+    return ("path", str(sample)) if isinstance(sample, Path) else ("bytes", sample)
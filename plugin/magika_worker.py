@@ -0,0 +1,55 @@
+"""
+A standalone Magika worker, which is run by `MagikaSubprocessSession` in a subprocess.
+
+This file must not import anything from this plugin since its source is run by another Python interpreter.
+
+It reads JSON-lines requests from stdin and writes JSON-lines responses to stdout.
+
+- Once the model is loaded: `{"id": 0, "model_name": str}` or `{"id": 0, "error": str}`
+- Request: `{"id": int, "paths": [str, ...]}`
+- Response: `{"id": int, "predictions": [[label, score], ...]}` or `{"id": int, "error": str}`
+- If the ID of a request can't be parsed: `{"id": 0, "error": str}` and then the worker exits
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def _write(msg: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(msg, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def main() -> int:
+    try:
+        from magika import Magika
+
+        magika = Magika()
+    except Exception as e:
+        _write({"id": 0, "error": f"{type(e).__name__}: {e}"})
+        return 1
+    _write({"id": 0, "model_name": magika.get_model_name()})
+
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+            request_id = int(request["id"])
+        except Exception as e:
+            # nobody can be told that its request fails, so exit to let the parent fail all pending requests
+            _write({"id": 0, "error": f"Invalid request: {type(e).__name__}: {e}"})
+            return 1
+        try:
+            results = magika.identify_paths([Path(path) for path in request["paths"]])
+            predictions = [(result.output.ct_label, result.output.score) for result in results]
+            _write({"id": request_id, "predictions": predictions})
+        except Exception as e:
+            _write({"id": request_id, "error": f"{type(e).__name__}: {e}"})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
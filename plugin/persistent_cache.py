@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Any, Generic, Mapping, TypeVar
+
+import sublime
+
+from .cache import LruCache
+from .constants import PLUGIN_NAME, VERSION
+
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+
+@dataclass
+class PersistentDecision:
+    """A syntax decision of a file, which is remembered across sessions."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    settings_hash: str
+    """The hash of merged settings which are used to make this decision."""
+    syntax_before: str
+    """The syntax path of the view before deciding."""
+    syntax: str
+    """The decided syntax path. An empty string means nothing is decided."""
+    reason: str
+
+    def is_fresh(self, stat: os.stat_result, settings_hash: str, syntax_before: str) -> bool:
+        return (
+            self.size == stat.st_size
+            and self.mtime_ns == stat.st_mtime_ns
+            and self.settings_hash == settings_hash
+            and self.syntax_before == syntax_before
+        )
+
+
+class PersistentLruCache(Generic[_K, _V], ABC):
+    """
+    An LRU cache which can be saved to and loaded from the disk.
+
+    It's stored in the JSON-lines format, one item per line,
+    from the least recently used one to the most recently used one.
+    """
+
+    SAVE_DELAY_MS = 3000
+
+    def __init__(self, path: Path, maxsize: int) -> None:
+        self.path = path
+        self._cache: LruCache[_K, _V] = LruCache(maxsize)
+        self._lock = threading.Lock()
+        self._is_dirty = False
+        self._is_save_scheduled = False
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def maxsize(self) -> int:
+        return self._cache.maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int) -> None:
+        self._cache.maxsize = max(0, value)
+
+    @abstractmethod
+    def _dump_item(self, key: _K, value: _V) -> Any:
+        """Converts an item into a JSON-serializable object."""
+
+    @abstractmethod
+    def _load_item(self, obj: Any) -> tuple[_K, _V]:
+        """Converts a JSON-deserialized object into an item. Raises `TypeError` or `ValueError` if it's invalid."""
+
+    def _set(self, key: _K, value: _V, *, save: bool = True) -> None:
+        """Sets an item. The cache is saved later if `save`."""
+        if self.maxsize <= 0:
+            return
+        self._cache.set(key, value)
+        self._is_dirty = True
+        if save:
+            self.schedule_save()
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._is_dirty = True
+
+    def load(self) -> None:
+        """Loads items from the disk. Corrupted lines are ignored."""
+        self._cache.clear()
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        key, value = self._load_item(json.loads(line))
+                    except (TypeError, ValueError):
+                        continue
+                    self._cache.set(key, value)
+        except OSError:
+            pass
+        self._is_dirty = False
+
+    def save(self) -> None:
+        """Saves items to the disk if there is any change."""
+        with self._lock:
+            self._is_save_scheduled = False
+            if not self._is_dirty:
+                return
+            self._is_dirty = False
+            content = "".join(
+                json.dumps(self._dump_item(key, value), ensure_ascii=False, separators=(",", ":")) + "\n"
+                for key, value in self._cache.items()
+            )
+            tmp_path = self.path.with_suffix(".tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_text(content, encoding="utf-8")
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"[{PLUGIN_NAME}][ERROR] Failed saving {self.path.name}: {e}")
+
+    def schedule_save(self) -> None:
+        """Saves items a bit later so that multiple changes are saved at once."""
+        with self._lock:
+            if self._is_save_scheduled:
+                return
+            self._is_save_scheduled = True
+        sublime.set_timeout_async(self.save, self.SAVE_DELAY_MS)
+
+
+class PersistentDecisionCache(PersistentLruCache[str, PersistentDecision]):
+    """An LRU cache of `PersistentDecision`s, keyed by the file path."""
+
+    def __init__(self, path: Path, maxsize: int = 2000) -> None:
+        super().__init__(path, maxsize)
+
+    def get(self, path: str, settings_hash: str, syntax_before: str) -> PersistentDecision | None:
+        """Gets the decision of `path` if it's still fresh."""
+        if not (entry := self._cache.get(path)):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return entry if entry.is_fresh(stat, settings_hash, syntax_before) else None
+
+    def set(self, entry: PersistentDecision) -> None:
+        self._set(entry.path, entry)
+
+    def _dump_item(self, key: str, value: PersistentDecision) -> Any:
+        return astuple(value)
+
+    def _load_item(self, obj: Any) -> tuple[str, PersistentDecision]:
+        entry = PersistentDecision(*obj)
+        return (entry.path, entry)
+
+
+def make_settings_hash(settings: Mapping[str, Any]) -> str:
+    """Makes a hash for `settings`, which tells whether a persisted decision is made with the same settings."""
+    serialized = json.dumps([VERSION, settings], sort_keys=True, default=str)
+    return hashlib.sha1(serialized.encode()).hexdigest()
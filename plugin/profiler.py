@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable
+
+_SAMPLE_SIZE = 1000
+
+
+@dataclass
+class RuleStats:
+    """Timing stats of testing a rule object."""
+
+    target: Any
+    """The rule object. It's kept so that its `id()` won't be re-used by another object."""
+    calls: int = 0
+    hits: int = 0
+    """The amount of calls which return a truthy value."""
+    total_ns: int = 0
+    samples: deque[int] = field(default_factory=lambda: deque(maxlen=_SAMPLE_SIZE), repr=False)
+    """Elapsed time (in nanoseconds) of the latest calls, for percentiles."""
+
+    @property
+    def misses(self) -> int:
+        return self.calls - self.hits
+
+    def percentile(self, q: float) -> int:
+        """Returns the `q`-th (0 ~ 100) percentile of elapsed time in nanoseconds, by the nearest-rank method."""
+        if not (samples := sorted(self.samples)):
+            return 0
+        return samples[min(len(samples) - 1, max(0, round(len(samples) * q / 100) - 1))]
+
+    def merge(self, other: RuleStats) -> None:
+        self.calls += other.calls
+        self.hits += other.hits
+        self.total_ns += other.total_ns
+        self.samples.extend(other.samples)
+
+
+class RuleProfiler:
+    """
+    Records call counts, hit/miss counts and elapsed time of testing rules.
+
+    When enabled, `test()` of given classes are replaced with measured ones.
+    When disabled, the original methods are restored, so there is no overhead at all.
+    """
+
+    def __init__(self) -> None:
+        self.stats: dict[int, RuleStats] = {}
+        """`id(rule)` => stats"""
+        self._originals: dict[type, Callable[..., Any] | None] = {}
+        """Patched classes => their own `test()`, which is `None` if it's inherited."""
+        self._lock = threading.Lock()
+
+    @property
+    def is_enabled(self) -> bool:
+        return bool(self._originals)
+
+    def enable(self, classes: Iterable[type]) -> None:
+        """Starts measuring `test()` of `classes`. Classes which are being measured are skipped."""
+        for cls in classes:
+            if cls not in self._originals:
+                self._originals[cls] = cls.__dict__.get("test")
+                cls.test = self._measure(cls.test)  # type: ignore
+
+    def disable(self) -> None:
+        """Restores `test()` of measured classes. Recorded stats are kept."""
+        for cls, test in self._originals.items():
+            if test:
+                cls.test = test  # type: ignore
+            else:
+                del cls.test  # type: ignore
+        self._originals.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats.clear()
+
+    def retain(self, targets: Iterable[Any]) -> None:
+        """Drops stats of rules which are not in `targets`, like those of rules which have been re-compiled."""
+        ids = set(map(id, targets))
+        with self._lock:
+            self.stats = {key: stats for key, stats in self.stats.items() if key in ids}
+
+    def _measure(self, test: Callable[..., Any]) -> Callable[..., Any]:
+        perf_counter_ns = time.perf_counter_ns
+
+        @wraps(test)
+        def wrapped(rule: Any, *args: Any, **kwargs: Any) -> Any:
+            result = False
+            started_at = perf_counter_ns()
+            try:
+                result = test(rule, *args, **kwargs)
+                return result
+            finally:
+                # a constraint may raise an exception, which is counted as a miss
+                elapsed_ns = perf_counter_ns() - started_at
+                with self._lock:
+                    if (stats := self.stats.get(id(rule))) is None:
+                        stats = self.stats[id(rule)] = RuleStats(rule)
+                    stats.calls += 1
+                    stats.hits += bool(result)
+                    stats.total_ns += elapsed_ns
+                    stats.samples.append(elapsed_ns)
+
+        return wrapped
+
+
+def format_stats_table(rows: Iterable[tuple[str, RuleStats]]) -> str:
+    """Formats `(label, stats)` into a plain text table, sorted by the total time in descending order."""
+    header = ("Total (ms)", "Calls", "Hits", "Misses", "Mean (µs)", "P50 (µs)", "P95 (µs)", "P99 (µs)", "Rule")
+    lines = [header]
+    for label, stats in sorted(rows, key=lambda row: row[1].total_ns, reverse=True):
+        lines.append((
+            f"{stats.total_ns / 1e6:.3f}",
+            str(stats.calls),
+            str(stats.hits),
+            str(stats.misses),
+            f"{stats.total_ns / max(1, stats.calls) / 1e3:.1f}",
+            f"{stats.percentile(50) / 1e3:.1f}",
+            f"{stats.percentile(95) / 1e3:.1f}",
+            f"{stats.percentile(99) / 1e3:.1f}",
+            label,
+        ))
+    widths = [max(len(line[idx]) for line in lines) for idx in range(len(header) - 1)]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(line, widths)) + f"  {line[-1]}" for line in lines
+    )
@@ -4,21 +4,25 @@ import operator
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Generator, Iterable, Pattern, TypeVar, final
+from typing import Any, Callable, Generator, Hashable, Iterable, Pattern, TypeVar, final
 
 from ..cache import clearable_lru_cache
 from ..constants import PLUGIN_NAME, ST_PLATFORM
+from ..scanner import LiteralHaystack, ScanKey
+from ..shared import G
 from ..snapshot import ViewSnapshot
-from ..types import Optimizable, ST_ConstraintRule
+from ..types import ConstraintCost, Optimizable, SnapshotInput, ST_ConstraintRule
 from ..utils import (
     camel_to_snake,
     compile_regex,
     first_true,
+    freeze,
     list_all_subclasses,
     merge_regexes,
     parse_regex_flags,
     remove_suffix,
 )
+from .index import FileNameGuard
 
 T = TypeVar("T")
 
@@ -43,6 +47,8 @@ class ConstraintRule(Optimizable):
     args: tuple[Any, ...] = tuple()
     kwargs: dict[str, Any] = field(default_factory=dict)
     inverted: bool = False  # whether the test result should be inverted
+    memo_key: Hashable | None = field(default=None, repr=False, compare=False)
+    """Identical constraints share the same key so they are tested at most once per snapshot."""
 
     def is_droppable(self) -> bool:
         return not (self.constraint and not self.constraint.is_droppable())
@@ -52,10 +58,22 @@ class ConstraintRule(Optimizable):
         yield
 
     def test(self, view_snapshot: ViewSnapshot) -> bool:
+        if (results := view_snapshot.constraint_results) is None:
+            return self._test(view_snapshot)
+
+        if cached := results.get(id(self)):
+            return cached[0]
+
+        assert self.constraint
+        result = self._test(view_snapshot)
+        results[id(self)] = (result, self.constraint.SNAPSHOT_INPUTS)
+        return result
+
+    def _test(self, view_snapshot: ViewSnapshot) -> bool:
         assert self.constraint
 
         try:
-            result = self.constraint.test(view_snapshot)
+            result = self._test_constraint(view_snapshot)
         except AlwaysTruthyException:
             return True
         except AlwaysFalsyException:
@@ -66,6 +84,34 @@ class ConstraintRule(Optimizable):
 
         return not result if self.inverted else result
 
+    def _test_constraint(self, view_snapshot: ViewSnapshot) -> bool:
+        """Tests the constraint. Its outcome, either the result or the exception, is memoized in the snapshot."""
+        assert self.constraint
+
+        if self.memo_key is None:
+            return self.constraint.test(view_snapshot)
+
+        memo = view_snapshot.constraint_memo
+        if (outcome := memo.get(self.memo_key)) is None:
+            try:
+                outcome = memo[self.memo_key] = self.constraint.test(view_snapshot)
+            except Exception as e:
+                memo[self.memo_key] = e
+                raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def cost(self) -> ConstraintCost:
+        """The cost class of testing this rule."""
+        return self.constraint.COST if self.constraint else ConstraintCost.FILESYSTEM
+
+    def file_name_guard(self) -> FileNameGuard | None:
+        """Returns necessary conditions on the file name for this rule to be satisfied, if any."""
+        if self.inverted or not self.constraint:
+            return None
+        return self.constraint.file_name_guard()
+
     @classmethod
     def make(cls, constraint_rule: ST_ConstraintRule) -> ConstraintRule:
         """Build this object with the `constraint_rule`."""
@@ -85,11 +131,28 @@ class ConstraintRule(Optimizable):
             obj.constraint_name = constraint
             if constraint_class := find_constraint(constraint):
                 obj.constraint = constraint_class(*obj.args, **obj.kwargs)
+                try:
+                    obj.memo_key = (constraint_class, freeze(obj.args), freeze(obj.kwargs))
+                except TypeError:
+                    pass
 
         return obj
 
 
 class AbstractConstraint(ABC):
+    COST: ConstraintCost = ConstraintCost.FILESYSTEM
+    """The cost class of `test()`. Cheaper constraints may be tested earlier in a commutative match."""
+    SNAPSHOT_INPUTS: SnapshotInput = SnapshotInput.ALL
+    """
+    Parts of the `ViewSnapshot` which the result depends on, apart from the file and the syntax.
+    It's used by incremental detection to decide whether a previous result can be re-used.
+    """
+    PROJECT_MARKERS: tuple[str, ...] = tuple()
+    """
+    Relative paths, like `.git`, which `test()` looks for in parent directories via `find_parent_with_sibling()`.
+    They are probed together with those of other constraints when a directory is walked.
+    """
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.args = args
         self.kwargs = kwargs
@@ -117,6 +180,27 @@ class AbstractConstraint(ABC):
     def test(self, view_snapshot: ViewSnapshot) -> bool:
         """Tests whether the `view_snapshot` passes this constraint."""
 
+    def content_scan_keys(self) -> tuple[tuple[ScanKey, int], ...]:
+        """
+        Returns `(key, limit)` pairs of content patterns which `test()` counts via `ViewSnapshot.count_in_content()`.
+        It's used to build the content scanner of a rule collection.
+        """
+        return tuple()
+
+    def literal_needles(self) -> tuple[tuple[LiteralHaystack, str], ...]:
+        """
+        Returns `(haystack, needle)` pairs which `test()` searches via `ViewSnapshot.contains_any_literal()`.
+        It's used to build the literal scanner of a rule collection.
+        """
+        return tuple()
+
+    def file_name_guard(self) -> FileNameGuard | None:
+        """
+        Returns necessary conditions on the file name for this constraint to pass.
+        It's used to build the decision index. `None` means there is no such condition.
+        """
+        return None
+
     @final
     def _handled_args(self, normalizer: Callable[[T], T] | None = None) -> tuple[T, ...]:
         """Filter falsy args and normalize them. Note that `0`, `""` and `None` are falsy."""
@@ -161,17 +245,15 @@ class AbstractConstraint(ABC):
     @final
     @staticmethod
     def find_parent_with_sibling(base: str | Path, sibling: str, *, use_exists: bool = False) -> Path | None:
-        """Find the first parent directory which contains `sibling`."""
-        path = Path(base).resolve()
-
-        if use_exists:
-            checker = Path.exists
-        elif sibling.endswith(("\\", "/")):
-            checker = Path.is_dir  # type: ignore
-        else:
-            checker = Path.is_file  # type: ignore
+        """
+        Find the first parent directory which contains `sibling`.
+        The `sibling` is a project marker of `G.project_marker_index`. A relative `base` is resolved first.
+        """
+        path = Path(base)
+        if not path.is_absolute():
+            path = path.resolve()
 
-        return first_true(path.parents, pred=lambda p: checker(p / sibling))
+        return first_true(G.project_marker_index.iter_parents_with_marker(path, sibling, use_exists=use_exists))
 
 
 class AlwaysTruthyException(Exception):
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 from typing import Any, final
 
+from ...scanner import ScanKey, str_scan_key
 from ...snapshot import ViewSnapshot
-from ...utils import nth, str_finditer
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint
 
 
 @final
 class ContainsConstraint(AbstractConstraint):
+    COST = ConstraintCost.CONTENT_SCAN
+    SNAPSHOT_INPUTS = SnapshotInput.CONTENT
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -18,14 +22,16 @@ class ContainsConstraint(AbstractConstraint):
     def is_droppable(self) -> bool:
         return not (self.needles and isinstance(self.threshold, (int, float)))
 
+    def content_scan_keys(self) -> tuple[tuple[ScanKey, int], ...]:
+        return tuple((str_scan_key(needle), self.threshold) for needle in self.needles)
+
     def test(self, view_snapshot: ViewSnapshot) -> bool:
         if self.threshold <= 0:
             return True
 
-        return (
-            nth(
-                (_ for needle in self.needles for _ in str_finditer(view_snapshot.content, needle)),
-                self.threshold - 1,
-            )
-            is not None
-        )
+        found = 0
+        for needle in self.needles:
+            found += view_snapshot.count_in_content(str_scan_key(needle), self.threshold - found)
+            if found >= self.threshold:
+                return True
+        return False
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 from typing import Any, final
 
+from ...scanner import ScanKey, regex_scan_key
 from ...snapshot import ViewSnapshot
-from ...utils import nth
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint
 
 
 @final
 class ContainsRegexConstraint(AbstractConstraint):
+    COST = ConstraintCost.CONTENT_SCAN
+    SNAPSHOT_INPUTS = SnapshotInput.CONTENT
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -18,14 +22,12 @@ class ContainsRegexConstraint(AbstractConstraint):
     def is_droppable(self) -> bool:
         return not isinstance(self.threshold, (int, float))
 
+    def content_scan_keys(self) -> tuple[tuple[ScanKey, int], ...]:
+        return ((regex_scan_key(self.regex.pattern, self.regex.flags), self.threshold),)
+
     def test(self, view_snapshot: ViewSnapshot) -> bool:
         if self.threshold <= 0:
             return True
 
-        return (
-            nth(
-                self.regex.finditer(view_snapshot.content),
-                self.threshold - 1,
-            )
-            is not None
-        )
+        key = regex_scan_key(self.regex.pattern, self.regex.flags)
+        return view_snapshot.count_in_content(key, self.threshold) >= self.threshold
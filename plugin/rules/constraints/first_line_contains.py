@@ -2,12 +2,17 @@ from __future__ import annotations
 
 from typing import Any, final
 
+from ...scanner import LiteralHaystack
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint
 
 
 @final
 class FirstLineContainsConstraint(AbstractConstraint):
+    COST = ConstraintCost.CONTENT_SCAN
+    SNAPSHOT_INPUTS = SnapshotInput.FIRST_LINE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -16,5 +21,8 @@ class FirstLineContainsConstraint(AbstractConstraint):
     def is_droppable(self) -> bool:
         return not self.needles
 
+    def literal_needles(self) -> tuple[tuple[LiteralHaystack, str], ...]:
+        return tuple(("first_line", needle) for needle in self.needles)
+
     def test(self, view_snapshot: ViewSnapshot) -> bool:
-        return any((needle in view_snapshot.first_line) for needle in self.needles)
+        return view_snapshot.contains_any_literal("first_line", self.needles)
@@ -3,11 +3,15 @@ from __future__ import annotations
 from typing import Any, final
 
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint
 
 
 @final
 class FirstLineContainsRegexConstraint(AbstractConstraint):
+    COST = ConstraintCost.CONTENT_SCAN
+    SNAPSHOT_INPUTS = SnapshotInput.FIRST_LINE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -4,11 +4,15 @@ from typing import Any, final
 
 from ...constants import ST_ARCH
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint
 
 
 @final
 class IsArchConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
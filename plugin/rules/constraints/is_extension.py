@@ -4,8 +4,10 @@ from typing import Any, final
 
 from ...settings import pref_trim_suffixes
 from ...snapshot import ViewSnapshot
-from ...utils import list_trimmed_strings
+from ...types import ConstraintCost, SnapshotInput
+from ...utils import trimmed_strings
 from ..constraint import AbstractConstraint, AlwaysFalsyException
+from ..index import FileNameGuard
 
 
 def _extensionize(ext: str) -> str:
@@ -15,6 +17,9 @@ def _extensionize(ext: str) -> str:
 
 @final
 class IsExtensionConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -33,12 +38,17 @@ class IsExtensionConstraint(AbstractConstraint):
             filename.endswith(self.exts)
             for filename in map(
                 self.fix_case,
-                list_trimmed_strings(
+                trimmed_strings(
                     view_snapshot.file_name,
                     pref_trim_suffixes(window=window),
                 ),
             )
         )
 
+    def file_name_guard(self) -> FileNameGuard:
+        if self.case_insensitive:
+            return FileNameGuard(exts_ci=set(self.exts))
+        return FileNameGuard(exts=set(self.exts))
+
     def fix_case(self, string: str) -> str:
         return string.lower() if self.case_insensitive else string
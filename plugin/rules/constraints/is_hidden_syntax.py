@@ -3,11 +3,15 @@ from __future__ import annotations
 from typing import Any, final
 
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint, AlwaysFalsyException
 
 
 @final
 class IsHiddenSyntaxConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -1,30 +1,41 @@
 from __future__ import annotations
 
+import os
+import re
+import time
+from itertools import islice
 from pathlib import Path
 from typing import final
 
+import sublime
+
+from ...logger import Logger
+from ...shared import G
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint, AlwaysFalsyException
 
+_SETTINGS_MODULE_REGEX = re.compile(r"""["']DJANGO_SETTINGS_MODULE["']\s*,\s*["']([\w.]+)["']""")
+"""Matches the settings module in `os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")`."""
+
 
 @final
 class IsInPythonDjangoProjectConstraint(AbstractConstraint):
     """Check whether this file is in a (Python) Django project."""
 
-    _success_dirs: set[Path] = set()
-    """Cached directories which make the result `True`."""
+    COST = ConstraintCost.FILESYSTEM
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+    PROJECT_MARKERS = ("manage.py",)
 
-    def test(self, view_snapshot: ViewSnapshot) -> bool:
-        cls = self.__class__
+    MANAGE_PY_MAX_BYTES = 32 * 1024
+    """The max amount of bytes read from `manage.py` for finding the settings module."""
+    MAX_SCANNED_ENTRIES = 500
+    """The max amount of entries in a project root to be scanned, if `manage.py` doesn't tell the settings module."""
 
+    def test(self, view_snapshot: ViewSnapshot) -> bool:
         # file not on disk, maybe just a buffer
-        if not (_file_path := view_snapshot.file_path):
+        if not (file_path := view_snapshot.file_path):
             raise AlwaysFalsyException("no filename")
-        file_path = Path(_file_path)
-
-        # fast check from the cache
-        if any(map(lambda p: p in cls._success_dirs, file_path.parents)):
-            return True
 
         # [projectname]/         <- project root
         # ├── [projectname]/     <- Django root
@@ -34,12 +45,64 @@ class IsInPythonDjangoProjectConstraint(AbstractConstraint):
         # │   └── wsgi.py
         # └── manage.py
 
-        for parent in file_path.parents:
-            if not (parent / "manage.py").is_file():
-                continue
-            for sub_dir in filter(Path.is_dir, parent.glob("*")):
-                if all((sub_dir / file).is_file() for file in ("settings.py", "urls.py", "wsgi.py")):
-                    cls._success_dirs.add(parent)
-                    return True
+        return any(
+            self._is_project_root(parent, window=view_snapshot.window)
+            for parent in G.project_marker_index.iter_parents_with_marker(file_path, "manage.py")
+        )
+
+    @classmethod
+    def _is_project_root(cls, root: Path, *, window: sublime.Window) -> bool:
+        # `manage.py` has been probed via the FS probe cache when walking up parents.
+        # A result may become stale without modifying `manage.py` or the root, like when `settings.py`
+        # is created or deleted in a subdirectory, so it expires like filesystem probes.
+        now = time.monotonic()
+        if (cached := G.django_root_results.get(str(root))) and cached[0] > now:
+            return cached[1]
+
+        started_at = time.perf_counter()
+        # the settings module may not be relative to the root, like in a "src/" layout, or may be computed
+        settings_module = cls._find_settings_module(root / "manage.py")
+        if settings_module and cls._has_settings_module(root, settings_module):
+            method = f'settings module "{settings_module}"'
+            result = True
+        else:
+            method = "scanning directories"
+            result = cls._scan_django_root(root)
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+        G.django_root_results.set(str(root), (now + G.fs_probe_cache.ttl_s, result))
+        Logger.log(
+            f"⏱️ Checked Django project root ({result}) by {method} in {elapsed_ms:.2f} ms: {root}",
+            window=window,
+        )
+        return result
+
+    @classmethod
+    def _find_settings_module(cls, manage_py: Path) -> str:
+        try:
+            with manage_py.open("rb") as f:
+                head = f.read(cls.MANAGE_PY_MAX_BYTES).decode("utf-8", errors="replace")
+        except OSError:
+            return ""
+        return m.group(1) if (m := _SETTINGS_MODULE_REGEX.search(head)) else ""
+
+    @staticmethod
+    def _has_settings_module(root: Path, settings_module: str) -> bool:
+        path = root.joinpath(*settings_module.split("."))
+        fs = G.fs_probe_cache
+        return fs.is_file(path.with_name(f"{path.name}.py")) or fs.is_file(path / "__init__.py")
 
+    @classmethod
+    def _scan_django_root(cls, root: Path) -> bool:
+        fs = G.fs_probe_cache
+        try:
+            with os.scandir(root) as it:
+                for entry in islice(it, cls.MAX_SCANNED_ENTRIES):
+                    # hidden directories are not Django roots
+                    if entry.name.startswith(".") or not entry.is_dir():
+                        continue
+                    if all(fs.is_file(Path(entry.path, file)) for file in ("settings.py", "urls.py", "wsgi.py")):
+                        return True
+        except OSError:
+            pass
         return False
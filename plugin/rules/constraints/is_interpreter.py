@@ -3,12 +3,16 @@ from __future__ import annotations
 from typing import Any, Pattern, final
 
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ...utils import compile_regex, merge_literals_to_regex, merge_regexes
 from ..constraint import AbstractConstraint
 
 
 @final
 class IsInterpreterConstraint(AbstractConstraint):
+    COST = ConstraintCost.CONTENT_SCAN
+    SNAPSHOT_INPUTS = SnapshotInput.FIRST_LINE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
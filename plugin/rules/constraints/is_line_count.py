@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any, Callable, final
 
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint
 
 Comparator = Callable[[Any, Any], bool]
@@ -10,6 +11,9 @@ Comparator = Callable[[Any, Any], bool]
 
 @final
 class IsLineCountConstraint(AbstractConstraint):
+    COST = ConstraintCost.CONTENT_SCAN
+    SNAPSHOT_INPUTS = SnapshotInput.LINE_COUNT
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -4,11 +4,15 @@ from typing import final
 
 from ...settings import get_merged_plugin_setting
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint
 
 
 @final
 class IsMagikaEnabledConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def test(self, view_snapshot: ViewSnapshot) -> bool:
         if not ((view := view_snapshot.valid_view) and (window := view.window())):
             return False
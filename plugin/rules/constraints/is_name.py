@@ -3,11 +3,16 @@ from __future__ import annotations
 from typing import Any, final
 
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint, AlwaysFalsyException
+from ..index import FileNameGuard
 
 
 @final
 class IsNameConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -26,3 +31,8 @@ class IsNameConstraint(AbstractConstraint):
         if self.case_insensitive:
             file_name = file_name.lower()
         return file_name in self.names
+
+    def file_name_guard(self) -> FileNameGuard:
+        if self.case_insensitive:
+            return FileNameGuard(names_ci=set(self.names))
+        return FileNameGuard(names=set(self.names))
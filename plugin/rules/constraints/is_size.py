@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any, Callable, final
 
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint, AlwaysFalsyException
 
 Comparator = Callable[[Any, Any], bool]
@@ -10,6 +11,9 @@ Comparator = Callable[[Any, Any], bool]
 
 @final
 class IsSizeConstraint(AbstractConstraint):
+    COST = ConstraintCost.FILESYSTEM
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -3,12 +3,16 @@ from __future__ import annotations
 from typing import Any, final
 
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ...utils import find_syntaxes_by_syntax_likes
 from ..constraint import AbstractConstraint, AlwaysFalsyException
 
 
 @final
 class IsSyntaxConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
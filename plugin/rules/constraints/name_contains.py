@@ -2,12 +2,18 @@ from __future__ import annotations
 
 from typing import Any, final
 
+from ...scanner import LiteralHaystack
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint, AlwaysFalsyException
+from ..index import FileNameGuard
 
 
 @final
 class NameContainsConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -16,8 +22,14 @@ class NameContainsConstraint(AbstractConstraint):
     def is_droppable(self) -> bool:
         return not self.needles
 
+    def literal_needles(self) -> tuple[tuple[LiteralHaystack, str], ...]:
+        return tuple(("file_name", needle) for needle in self.needles)
+
     def test(self, view_snapshot: ViewSnapshot) -> bool:
-        if not (file_name := view_snapshot.file_name):
+        if not view_snapshot.file_name:
             raise AlwaysFalsyException("file not on disk")
 
-        return any((needle in file_name) for needle in self.needles)
+        return view_snapshot.contains_any_literal("file_name", self.needles)
+
+    def file_name_guard(self) -> FileNameGuard:
+        return FileNameGuard(name_needles=set(self.needles))
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 from typing import Any, final
 
+from ...scanner import LiteralHaystack
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint, AlwaysFalsyException
 
 
 @final
 class PathContainsConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -16,8 +21,11 @@ class PathContainsConstraint(AbstractConstraint):
     def is_droppable(self) -> bool:
         return not self.needles
 
+    def literal_needles(self) -> tuple[tuple[LiteralHaystack, str], ...]:
+        return tuple(("file_path", needle) for needle in self.needles)
+
     def test(self, view_snapshot: ViewSnapshot) -> bool:
-        if not (file_path := view_snapshot.file_path):
+        if not view_snapshot.file_path:
             raise AlwaysFalsyException("file not on disk")
 
-        return any((needle in file_path) for needle in self.needles)
+        return view_snapshot.contains_any_literal("file_path", self.needles)
@@ -3,12 +3,17 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, final
 
+from ...shared import G
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint, AlwaysFalsyException
 
 
 @final
 class RelativeExistsConstraint(AbstractConstraint):
+    COST = ConstraintCost.FILESYSTEM
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
@@ -25,7 +30,8 @@ class RelativeExistsConstraint(AbstractConstraint):
             raise AlwaysFalsyException("no filename")
 
         folder = Path(file_path).parent
+        fs = G.fs_probe_cache
         return self.matcher(
-            (Path.is_dir if relative.endswith(("\\", "/")) else Path.is_file)(folder / relative)
+            (fs.is_dir if relative.endswith(("\\", "/")) else fs.is_file)(folder / relative)
             for relative in self.relatives
         )
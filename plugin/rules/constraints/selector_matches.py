@@ -5,11 +5,15 @@ from typing import Any, final
 import sublime
 
 from ...snapshot import ViewSnapshot
+from ...types import ConstraintCost, SnapshotInput
 from ..constraint import AbstractConstraint, AlwaysFalsyException
 
 
 @final
 class SelectorMatchesConstraint(AbstractConstraint):
+    COST = ConstraintCost.PURE_STRING
+    SNAPSHOT_INPUTS = SnapshotInput.NONE
+
     SCORE_THRESHOLD = 1
     """
     Quick tips (ST >= 4173):
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import TYPE_CHECKING, Set
+
+import sublime
+
+from ..settings import pref_trim_suffixes
+from ..snapshot import ViewSnapshot
+from ..types import ListenerEvent
+from ..utils import trimmed_strings
+
+if TYPE_CHECKING:
+    from .syntax import SyntaxRule
+
+RuleIds = Set[int]
+
+
+@dataclass
+class FileNameGuard:
+    """
+    Necessary conditions on the file name for a rule to be satisfied.
+
+    A rule with a guard can only be satisfied if the file name fulfills any condition in its guard.
+    """
+
+    names: set[str] = field(default_factory=set)
+    """Exact file names."""
+    names_ci: set[str] = field(default_factory=set)
+    """Exact file names, which are compared case-insensitively. They are lowercased."""
+    exts: set[str] = field(default_factory=set)
+    """File extensions (suffixes), which are tested against trimmed file names."""
+    exts_ci: set[str] = field(default_factory=set)
+    """File extensions (suffixes), which are compared case-insensitively. They are lowercased."""
+    name_needles: set[str] = field(default_factory=set)
+    """Substrings of the file name."""
+
+    @classmethod
+    def union(cls, guards: Iterable[FileNameGuard]) -> FileNameGuard:
+        """Creates a guard which is fulfilled if any of `guards` is fulfilled."""
+        obj = cls()
+        for guard in guards:
+            obj.names |= guard.names
+            obj.names_ci |= guard.names_ci
+            obj.exts |= guard.exts
+            obj.exts_ci |= guard.exts_ci
+            obj.name_needles |= guard.name_needles
+        return obj
+
+
+class SyntaxRuleIndex:
+    """
+    The decision index of a compiled `SyntaxRuleCollection`.
+
+    It maps cheap discriminating facts of a view (file name, top scope and event) to candidate rules,
+    so that only rules which can possibly be satisfied are tested, in their original order.
+    """
+
+    def __init__(self, rules: Iterable[SyntaxRule]) -> None:
+        self.rules: tuple[SyntaxRule, ...] = tuple(rules)
+        self.unguarded: RuleIds = set()
+        """Rules which have no file name guard. They are always candidates."""
+        self.names: dict[str, RuleIds] = {}
+        self.names_ci: dict[str, RuleIds] = {}
+        self.exts: dict[str, RuleIds] = {}
+        self.exts_ci: dict[str, RuleIds] = {}
+        self.name_needles: dict[str, RuleIds] = {}
+
+        self._applicable_cache: dict[tuple[ListenerEvent | None, str], tuple[tuple[int, ...], frozenset[int]]] = {}
+
+        for rule_id, rule in enumerate(self.rules):
+            if not (guard := rule.file_name_guard()):
+                self.unguarded.add(rule_id)
+                continue
+            for mapping, keys in (
+                (self.names, guard.names),
+                (self.names_ci, guard.names_ci),
+                (self.exts, guard.exts),
+                (self.exts_ci, guard.exts_ci),
+                (self.name_needles, guard.name_needles),
+            ):
+                for key in keys:
+                    mapping.setdefault(key, set()).add(rule_id)
+
+        self._exts_max_len = max(map(len, chain(self.exts, self.exts_ci)), default=0)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @property
+    def guarded_count(self) -> int:
+        """The amount of rules which are indexed by file name."""
+        return len(self.rules) - len(self.unguarded)
+
+    def candidates(self, view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> list[SyntaxRule]:
+        """Lists rules which may be satisfied by the `view_snapshot`, in their original order."""
+        if not (syntax := view_snapshot.syntax):
+            return []
+
+        unguarded, applicable = self._applicable_rule_ids(syntax, event)
+        if len(unguarded) == len(applicable):
+            return [self.rules[rule_id] for rule_id in unguarded]
+
+        rule_ids = self._guarded_rule_ids(view_snapshot) & applicable
+        return [self.rules[rule_id] for rule_id in sorted(chain(unguarded, rule_ids))]
+
+    def _applicable_rule_ids(
+        self,
+        syntax: sublime.Syntax,
+        event: ListenerEvent | None,
+    ) -> tuple[tuple[int, ...], frozenset[int]]:
+        """Returns `(unguarded, all)` rule IDs whose `on_events` and `selector` are fulfilled."""
+        key = (event, syntax.scope)
+        if (cached := self._applicable_cache.get(key)) is None:
+            applicable = tuple(rule_id for rule_id, rule in enumerate(self.rules) if rule.is_applicable(syntax, event))
+            cached = self._applicable_cache[key] = (
+                tuple(rule_id for rule_id in applicable if rule_id in self.unguarded),
+                frozenset(applicable),
+            )
+        return cached
+
+    def _guarded_rule_ids(self, view_snapshot: ViewSnapshot) -> RuleIds:
+        """Returns IDs of guarded rules whose guard is fulfilled by the file name."""
+        if not (file_name := view_snapshot.file_name):
+            return set()
+
+        rule_ids: RuleIds = set()
+        file_name_lower = file_name.lower()
+
+        rule_ids.update(self.names.get(file_name, ()))
+        rule_ids.update(self.names_ci.get(file_name_lower, ()))
+        for needle, needle_rule_ids in self.name_needles.items():
+            if needle in file_name:
+                rule_ids.update(needle_rule_ids)
+
+        if self._exts_max_len and (view := view_snapshot.valid_view) and (window := view.window()):
+            for trimmed in trimmed_strings(file_name, pref_trim_suffixes(window=window)):
+                self._update_by_suffixes(rule_ids, self.exts, trimmed)
+                self._update_by_suffixes(rule_ids, self.exts_ci, trimmed.lower())
+
+        return rule_ids
+
+    def _update_by_suffixes(self, rule_ids: RuleIds, mapping: dict[str, RuleIds], string: str) -> None:
+        if not mapping:
+            return
+        for begin in range(max(0, len(string) - self._exts_max_len), len(string)):
+            if suffix_rule_ids := mapping.get(string[begin:]):
+                rule_ids.update(suffix_rule_ids)
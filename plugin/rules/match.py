@@ -6,9 +6,10 @@ from typing import Any, Generator, Union, final
 
 from ..cache import clearable_lru_cache
 from ..snapshot import ViewSnapshot
-from ..types import Optimizable, ST_MatchRule
+from ..types import ConstraintCost, Optimizable, ST_MatchRule
 from ..utils import camel_to_snake, first_true, list_all_subclasses, remove_suffix
-from .constraint import ConstraintRule
+from .constraint import AbstractConstraint, ConstraintRule
+from .index import FileNameGuard
 
 
 def find_match(obj: Any) -> type[AbstractMatch] | None:
@@ -33,6 +34,8 @@ class MatchRule(Optimizable):
     args: tuple[Any, ...] = tuple()
     kwargs: dict[str, Any] = field(default_factory=dict)
     rules: tuple[MatchableRule, ...] = tuple()
+    reordered_from: tuple[int, ...] = field(default=tuple(), compare=False)
+    """Indexes of `rules` in their declared order, if they are reordered by cost during optimizing."""
 
     def is_droppable(self) -> bool:
         return not (self.rules and self.match and not self.match.is_droppable(self.rules))
@@ -49,11 +52,48 @@ class MatchRule(Optimizable):
                 continue
             rules.append(rule)
         self.rules = tuple(rules)
+        self._reorder_rules_by_cost()
+
+    def _reorder_rules_by_cost(self) -> None:
+        """Moves cheaper rules forward if the result doesn't depend on the order of rules."""
+        if not (self.match and self.match.IS_COMMUTATIVE):
+            return
+        order = sorted(range(len(self.rules)), key=lambda idx: self.rules[idx].cost())
+        if order != list(range(len(order))):
+            self.rules = tuple(self.rules[idx] for idx in order)
+            self.reordered_from = tuple(order)
+
+    def cost(self) -> ConstraintCost:
+        """The cost class of testing this rule, which is the one of the most expensive rule in it."""
+        return max((rule.cost() for rule in self.rules), default=ConstraintCost.PURE_STRING)
 
     def test(self, view_snapshot: ViewSnapshot) -> bool:
         assert self.match
         return self.match.test(view_snapshot, self.rules)
 
+    def iter_constraint_rules(self) -> Generator[ConstraintRule, None, None]:
+        """Yields all `ConstraintRule`s in this rule recursively."""
+        for rule in self.rules:
+            if isinstance(rule, MatchRule):
+                yield from rule.iter_constraint_rules()
+            else:
+                yield rule
+
+    def iter_rules(self) -> Generator[MatchableRule | AbstractConstraint, None, None]:
+        """Yields this rule and all rules in it recursively, including constraint objects."""
+        yield self
+        for rule in self.rules:
+            if isinstance(rule, MatchRule):
+                yield from rule.iter_rules()
+                continue
+            yield rule
+            if rule.constraint:
+                yield rule.constraint
+
+    def file_name_guard(self) -> FileNameGuard | None:
+        """Returns necessary conditions on the file name for this rule to be satisfied, if any."""
+        return self.match.file_name_guard(self.rules) if self.match else None
+
     @classmethod
     def make(cls, match_rule: ST_MatchRule) -> MatchRule:
         """Build this object with the `match_rule`."""
@@ -90,6 +130,9 @@ MatchableRule = Union[ConstraintRule, MatchRule]
 
 
 class AbstractMatch(ABC):
+    IS_COMMUTATIVE = False
+    """Whether the result of `test()` doesn't depend on the order of rules. If so, rules may be reordered by cost."""
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.args = args
         self.kwargs = kwargs
@@ -117,6 +160,13 @@ class AbstractMatch(ABC):
     def test(self, view_snapshot: ViewSnapshot, rules: tuple[MatchableRule, ...]) -> bool:
         """Tests whether the `view_snapshot` passes this `match` with those `rules`."""
 
+    def file_name_guard(self, rules: tuple[MatchableRule, ...]) -> FileNameGuard | None:
+        """
+        Returns necessary conditions on the file name for this `match` to pass with those `rules`.
+        It's used to build the decision index. `None` means there is no such condition.
+        """
+        return None
+
     @final
     @staticmethod
     def test_count(view_snapshot: ViewSnapshot, rules: tuple[MatchableRule, ...], goal: float) -> bool:
@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import final
 
 from ...snapshot import ViewSnapshot
+from ...utils import first_true
+from ..index import FileNameGuard
 from ..match import AbstractMatch, MatchableRule
 
 
@@ -10,8 +12,14 @@ from ..match import AbstractMatch, MatchableRule
 class AllMatch(AbstractMatch):
     """Matches when all rules are matched."""
 
+    IS_COMMUTATIVE = True
+
     def is_droppable(self, rules: tuple[MatchableRule, ...]) -> bool:
         return len(rules) == 0
 
     def test(self, view_snapshot: ViewSnapshot, rules: tuple[MatchableRule, ...]) -> bool:
         return all(rule.test(view_snapshot) for rule in rules)
+
+    def file_name_guard(self, rules: tuple[MatchableRule, ...]) -> FileNameGuard | None:
+        # every rule has to pass, thus any guard of them is a necessary condition
+        return first_true(rule.file_name_guard() for rule in rules)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import final
 
 from ...snapshot import ViewSnapshot
+from ..index import FileNameGuard
 from ..match import AbstractMatch, MatchableRule
 
 
@@ -10,8 +11,19 @@ from ..match import AbstractMatch, MatchableRule
 class AnyMatch(AbstractMatch):
     """Matches when any rule is matched."""
 
+    IS_COMMUTATIVE = True
+
     def is_droppable(self, rules: tuple[MatchableRule, ...]) -> bool:
         return len(rules) == 0
 
     def test(self, view_snapshot: ViewSnapshot, rules: tuple[MatchableRule, ...]) -> bool:
         return any(rule.test(view_snapshot) for rule in rules)
+
+    def file_name_guard(self, rules: tuple[MatchableRule, ...]) -> FileNameGuard | None:
+        guards: list[FileNameGuard] = []
+        for rule in rules:
+            # if any rule is unguarded, this match may pass with any file name
+            if not (guard := rule.file_name_guard()):
+                return None
+            guards.append(guard)
+        return FileNameGuard.union(guards) if guards else None
@@ -11,6 +11,8 @@ from ..match import AbstractMatch, MatchableRule
 class RatioMatch(AbstractMatch):
     """Matches ratio like `(2, 3)`, which means at least two thirds of rules should be matched."""
 
+    IS_COMMUTATIVE = True
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
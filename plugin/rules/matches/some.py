@@ -11,6 +11,8 @@ from ..match import AbstractMatch, MatchableRule
 class SomeMatch(AbstractMatch):
     """Matches some like `(5,)`, which means at least 5 rules should be matched."""
 
+    IS_COMMUTATIVE = True
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
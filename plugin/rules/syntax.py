@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 from collections.abc import Generator, Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any, Hashable
 
 import sublime
 
 from ..constants import VERSION
+from ..scanner import ContentScanner, LiteralScanner
+from ..shared import G
 from ..snapshot import ViewSnapshot
 from ..types import ListenerEvent, Optimizable, ST_SyntaxRule
 from ..utils import find_syntax_by_syntax_likes, first_true
+from .constraint import AbstractConstraint
+from .index import FileNameGuard, SyntaxRuleIndex
 from .match import MatchRule
 
 
@@ -36,15 +42,23 @@ class SyntaxRule(Optimizable):
                     yield self.root_rule
                     self.root_rule = None
 
-    def test(self, view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+    def is_applicable(self, syntax: sublime.Syntax | None, event: ListenerEvent | None = None) -> bool:
+        """Determines whether this rule works for the `syntax` and the `event`, regardless of its match rule."""
         if event and self.on_events is not None and event not in self.on_events:
             return False
 
-        if not view_snapshot.syntax:
+        if not syntax:
             return False
 
         # note that an empty selector matches anything
-        if sublime.score_selector(view_snapshot.syntax.scope, self.selector) == 0:
+        return sublime.score_selector(syntax.scope, self.selector) != 0
+
+    def file_name_guard(self) -> FileNameGuard | None:
+        """Returns necessary conditions on the file name for this rule to be satisfied, if any."""
+        return self.root_rule.file_name_guard() if self.root_rule else None
+
+    def test(self, view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> bool:
+        if not self.is_applicable(view_snapshot.syntax, event):
             return False
 
         assert self.root_rule
@@ -80,10 +94,25 @@ class SyntaxRule(Optimizable):
         return obj
 
 
+_collection_generations = count()
+
+
 @dataclass
 class SyntaxRuleCollection(Optimizable):
     version: str = VERSION
     rules: tuple[SyntaxRule, ...] = tuple()
+    index: SyntaxRuleIndex | None = field(default=None, repr=False, compare=False)
+    """The decision index, which is built by `compile()`."""
+    scanner: ContentScanner | None = field(default=None, repr=False, compare=False)
+    """The scanner of content patterns used by rules, which is built by `compile()`."""
+    literal_scanner: LiteralScanner | None = field(default=None, repr=False, compare=False)
+    """The scanner of literal needles used by rules, which is built by `compile()`."""
+    generation: int = field(default_factory=lambda: next(_collection_generations), repr=False, compare=False)
+    """A unique number of this object. It's used to tell whether a cached decision is made by outdated rules."""
+    settings_hash: str = field(default="", repr=False, compare=False)
+    """The hash of merged settings which this object is compiled from. It's used by the persistent cache."""
+    merged_constraint_count: int = field(default=0, repr=False, compare=False)
+    """The amount of constraint objects which are merged into identical ones by interning."""
 
     def __len__(self) -> int:
         return len(self.rules)
@@ -100,13 +129,63 @@ class SyntaxRuleCollection(Optimizable):
                 continue
             rules.append(rule)
         self.rules = tuple(rules)
+        self.index = None
+        self.scanner = None
+        self.literal_scanner = None
+
+    def compile(self) -> SyntaxRuleIndex:
+        """Builds the decision index and scanners for `rules`. This should be called after `optimize()`."""
+        self.index = SyntaxRuleIndex(self.rules)
+        constraints = [
+            constraint_rule.constraint
+            for rule in self.rules
+            if rule.root_rule
+            for constraint_rule in rule.root_rule.iter_constraint_rules()
+            if constraint_rule.constraint
+        ]
+        self.scanner = ContentScanner.from_keys(
+            scan_key for constraint in constraints for scan_key in constraint.content_scan_keys()
+        )
+        self.literal_scanner = LiteralScanner.from_needles(
+            pair for constraint in constraints for pair in constraint.literal_needles()
+        )
+        G.project_marker_index.register(marker for constraint in constraints for marker in constraint.PROJECT_MARKERS)
+        return self.index
+
+    def iter_rules(self) -> Generator[Any, None, None]:
+        """Yields all rules in this collection recursively, including constraint objects."""
+        for rule in self.rules:
+            yield rule
+            if rule.root_rule:
+                yield from rule.root_rule.iter_rules()
 
     def test(self, view_snapshot: ViewSnapshot, event: ListenerEvent | None = None) -> SyntaxRule | None:
-        return first_true(self.rules, pred=lambda rule: rule.test(view_snapshot, event))
+        if self.scanner:
+            view_snapshot.content_scanner = self.scanner
+        if self.literal_scanner:
+            view_snapshot.literal_scanner = self.literal_scanner
+        rules = self.index.candidates(view_snapshot, event) if self.index else self.rules
+        return first_true(rules, pred=lambda rule: rule.test(view_snapshot, event))
 
     @classmethod
     def make(cls, syntax_rules: Iterable[ST_SyntaxRule]) -> SyntaxRuleCollection:
         """Build this object with the `syntax_rules`."""
         obj = cls()
         obj.rules = tuple(map(SyntaxRule.make, syntax_rules))
+        obj.merged_constraint_count = obj._intern_constraints()
         return obj
+
+    def _intern_constraints(self) -> int:
+        """Makes identical constraints share the same object. Returns the amount of merged objects."""
+        interned: dict[Hashable, AbstractConstraint] = {}
+        merged = 0
+        for rule in self.rules:
+            if not rule.root_rule:
+                continue
+            for constraint_rule in rule.root_rule.iter_constraint_rules():
+                if constraint_rule.memo_key is None or not (constraint := constraint_rule.constraint):
+                    continue
+                if (shared := interned.setdefault(constraint_rule.memo_key, constraint)) is not constraint:
+                    constraint_rule.constraint = shared
+                    merged += 1
+        return merged
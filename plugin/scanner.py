@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Literal, Tuple
+
+from .utils import compile_regex
+
+ScanKey = Tuple[str, str, int]
+"""`(kind, pattern, regex_flags)` where `kind` is either `"str"` or `"regex"`."""
+ScanCount = Tuple[int, int]
+"""`(count, limit)`. If `count < limit`, `count` is the total amount of matches."""
+
+LiteralHaystack = Literal["file_name", "file_path", "first_line"]
+"""The name of the `ViewSnapshot` attribute which literal needles are searched in."""
+
+SCAN_UNLIMITED = 2**63
+
+
+def str_scan_key(needle: str) -> ScanKey:
+    return ("str", needle, 0)
+
+
+def regex_scan_key(pattern: str, flags: int) -> ScanKey:
+    return ("regex", pattern, flags)
+
+
+class ContentScanner:
+    """
+    Counts matches of patterns in the snapshot content, so that each distinct pattern is scanned at most once.
+
+    Counts are stored in the snapshot. A compiled rule collection knows the max count which is needed
+    for each pattern by all its rules. Thus, a pattern is scanned up to that count at once
+    rather than being scanned again when a rule needs a larger count.
+    """
+
+    def __init__(self, limits: dict[ScanKey, int] | None = None) -> None:
+        self.limits: dict[ScanKey, int] = limits or {}
+        """The max count which is needed for each pattern."""
+
+    def __len__(self) -> int:
+        return len(self.limits)
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[tuple[ScanKey, int]]) -> ContentScanner:
+        """Creates a scanner from `(key, limit)` pairs."""
+        limits: dict[ScanKey, int] = {}
+        for key, limit in keys:
+            limits[key] = max(limits.get(key, 0), limit)
+        return cls(limits)
+
+    def count(self, content: str, counts: dict[ScanKey, ScanCount], key: ScanKey, limit: int) -> int:
+        """Counts non-overlapping matches of `key` in `content`. The result is capped by `limit` (at least)."""
+        if (cached := counts.get(key)) and (cached[0] < cached[1] or cached[1] >= limit):
+            return cached[0]
+
+        kind, pattern, flags = key
+        if kind == "str":
+            # `str.count` is fast enough and it counts all occurrences
+            result = counts[key] = (content.count(pattern), SCAN_UNLIMITED)
+        else:
+            limit = max(limit, self.limits.get(key, 0))
+            found = 0
+            for _ in compile_regex(pattern, flags).finditer(content):
+                found += 1
+                if found >= limit:
+                    break
+            result = counts[key] = (found, limit)
+        return result[0]
+
+
+class LiteralMatcher:
+    """
+    Finds all literal needles which are in a haystack at once.
+
+    Needles are tested from the longest one. When a needle is found, needles which are substrings of it
+    are known to be found as well without testing them again.
+    """
+
+    def __init__(self, needles: Iterable[str]) -> None:
+        self.needles: tuple[str, ...] = tuple(sorted(set(needles), key=len, reverse=True))
+        self.implied: dict[str, tuple[str, ...]] = {
+            needle: tuple(other for other in self.needles if other != needle and other in needle)
+            for needle in self.needles
+        }
+        """Needles which are substrings of each needle."""
+
+    def __len__(self) -> int:
+        return len(self.needles)
+
+    def find(self, haystack: str) -> frozenset[str]:
+        """Finds needles which are in `haystack`."""
+        found: set[str] = set()
+        if not haystack:
+            return frozenset(found)
+        for needle in self.needles:
+            if needle not in found and needle in haystack:
+                found.add(needle)
+                found.update(self.implied[needle])
+        return frozenset(found)
+
+
+class LiteralScanner:
+    """
+    Finds literal needles of all rules in snapshot attributes, so that each attribute is searched at most once.
+
+    Found needles are stored in the snapshot. Needles which are unknown to this scanner,
+    like those from a constraint outside a compiled rule collection, are tested directly.
+    """
+
+    def __init__(self, matchers: dict[LiteralHaystack, LiteralMatcher] | None = None) -> None:
+        self.matchers: dict[LiteralHaystack, LiteralMatcher] = matchers or {}
+
+    def __len__(self) -> int:
+        return sum(map(len, self.matchers.values()))
+
+    @classmethod
+    def from_needles(cls, pairs: Iterable[tuple[LiteralHaystack, str]]) -> LiteralScanner:
+        """Creates a scanner from `(haystack, needle)` pairs."""
+        needles: defaultdict[LiteralHaystack, set[str]] = defaultdict(set)
+        for haystack, needle in pairs:
+            needles[haystack].add(needle)
+        return cls({haystack: LiteralMatcher(needles_) for haystack, needles_ in needles.items()})
+
+    def contains_any(
+        self,
+        text: str,
+        founds: dict[LiteralHaystack, frozenset[str]],
+        haystack: LiteralHaystack,
+        needles: Iterable[str],
+    ) -> bool:
+        """Tests whether any of `needles` is in `text`, which is the value of `haystack`."""
+        if not (matcher := self.matchers.get(haystack)):
+            return any((needle in text) for needle in needles)
+        if (found := founds.get(haystack)) is None:
+            found = founds[haystack] = matcher.find(text)
+        return any(((needle in found) if needle in matcher.implied else (needle in text)) for needle in needles)
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Iterable, List
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
 
 import sublime
 
+from .cache import LruCache
+from .constants import PLUGIN_STORAGE_DIR
+from .executor import CoalescingExecutor
+from .fs_cache import FsProbeCache, ProjectMarkerIndex
+from .incremental import ConstraintMemo
+from .magika_session import MagikaBatcher, MagikaPredictionCache, MagikaSession
+from .persistent_cache import PersistentDecisionCache
+from .profiler import RuleProfiler
 from .settings import get_merged_plugin_settings
-from .types import Optimizable, WindowKeyedDict
+from .types import ListenerEvent, Optimizable, SyntaxDecision, WindowKeyedDict
 
 if TYPE_CHECKING:
     from .rules import SyntaxRuleCollection
@@ -13,13 +21,30 @@ if TYPE_CHECKING:
 DroppedRules = List[Optimizable]
 DroppedRulesArg = Iterable[Optimizable]
 
+DecisionCacheKey = Tuple[int, Optional[ListenerEvent], bool]
+"""`(buffer_id, event, must_plaintext)`"""
+DecisionFingerprint = Tuple[int, str, Optional[Tuple[int, int]], int, str]
+"""`(change_count, file_name, (file_size, file_mtime_ns), rules_generation, syntax_path)`"""
+DjangoRootResult = Tuple[float, bool]
+"""`(expire_at, result)`"""
+
+
+class SyntaxDecisionCache(LruCache[DecisionCacheKey, Tuple[DecisionFingerprint, Optional[SyntaxDecision]]]):
+    """Caches the latest syntax decision for buffers. A decision is reusable only if its fingerprint matches."""
+
+    def __init__(self, maxsize: int = 512) -> None:
+        super().__init__(maxsize)
+
+
 # `UserDict` is not subscriptable until Python 3.9...
 if TYPE_CHECKING:
     _WindowKeyedDict_DroppedRules = WindowKeyedDict[DroppedRules]
     _WindowKeyedDict_SyntaxRuleCollection = WindowKeyedDict[SyntaxRuleCollection]
+    _WindowKeyedDict_SyntaxDecisionCache = WindowKeyedDict[SyntaxDecisionCache]
 else:
     _WindowKeyedDict_DroppedRules = WindowKeyedDict
     _WindowKeyedDict_SyntaxRuleCollection = WindowKeyedDict
+    _WindowKeyedDict_SyntaxDecisionCache = WindowKeyedDict
 
 
 class DroppedRulesCollection(_WindowKeyedDict_DroppedRules):
@@ -30,6 +55,10 @@ class SyntaxRuleCollections(_WindowKeyedDict_SyntaxRuleCollection):
     pass
 
 
+class SyntaxDecisionCaches(_WindowKeyedDict_SyntaxDecisionCache):
+    pass
+
+
 class G:
     """This class holds "G"lobal variables as its class variables."""
 
@@ -42,6 +71,43 @@ class G:
     dropped_rules_collection = DroppedRulesCollection()
     """Those per-window rules which are dropped after doing optimizations."""
 
+    syntax_decision_caches = SyntaxDecisionCaches()
+    """The per-window cached syntax decisions of buffers."""
+
+    constraint_memos: LruCache[int, ConstraintMemo] = LruCache(maxsize=64)
+    """Results of constraint rules for buffers (keyed by buffer ID) used by incremental detection."""
+
+    detection_executor = CoalescingExecutor()
+    """The worker pool for deciding syntax asynchronously. Jobs are coalesced per buffer."""
+
+    fs_probe_cache = FsProbeCache()
+    """Cached filesystem probes (like whether a file exists) which are used by constraints."""
+
+    project_marker_index = ProjectMarkerIndex(fs_probe_cache)
+    """Project markers (like `.git`) of directories, which are used by constraints like `is_in_git_repo`."""
+
+    django_root_results: LruCache[str, DjangoRootResult] = LruCache(maxsize=256)
+    """Results of `is_in_python_django_project` per project root, which expire like filesystem probes."""
+
+    magika_session = MagikaSession()
+    """The shared Magika object, whose model is loaded on the first use."""
+
+    magika_prediction_cache = MagikaPredictionCache(PLUGIN_STORAGE_DIR / "magika_cache.jsonl")
+    """Magika predictions keyed by the hash of predicted bytes, which may be remembered across sessions."""
+
+    magika_batcher = MagikaBatcher(
+        magika_session,
+        magika_prediction_cache,
+        is_batching_thread=detection_executor.is_worker_thread,
+    )
+    """Predictions of Magika, which are batched when they are requested at the same time."""
+
+    persistent_decision_cache = PersistentDecisionCache(PLUGIN_STORAGE_DIR / "decision_cache.jsonl")
+    """Syntax decisions of startup views, which are remembered across sessions."""
+
+    rule_profiler = RuleProfiler()
+    """Timing stats of testing rules, which are recorded only when "profile_rules" is enabled."""
+
     @classmethod
     def is_plugin_ready(cls, window: sublime.Window) -> bool:
         return bool(get_merged_plugin_settings(window=window) and cls.syntax_rule_collections.get(window))
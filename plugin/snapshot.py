@@ -1,39 +1,120 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
+from typing import Hashable, Iterable
 
 import sublime
 
+from .scanner import ContentScanner, LiteralHaystack, LiteralScanner, ScanCount, ScanKey
 from .settings import get_merged_plugin_setting
-from .utils import head_tail_content_st
+from .types import SnapshotInput
+from .utils import head_tail_content_file, head_tail_content_st
 
 
 @dataclass
 class ViewSnapshot:
+    """
+    A snapshot of a view at the moment.
+
+    Cheap attributes are captured when the snapshot is created. Expensive ones, like those read from the buffer
+    or the filesystem, are computed on the first access and then memoized.
+    """
+
     view: sublime.View
     """The view object."""
+    window: sublime.Window
+    """The window of the view. It's used to read settings."""
     char_count: int
     """Character count."""
-    content: str
-    """Pseudo file content."""
-    first_line: str
-    """Pseudo first line."""
-    line_count: int
-    """Number of lines in the original content."""
-    path_obj: Path | None
-    """The path object of this file. `None` if not on a disk."""
     syntax: sublime.Syntax | None
     """The syntax object. Note that the value is as-is when it's cached."""
+    change_count: int = 0
+    """The change count of the view. It tells whether the view has been modified since the snapshot."""
     caret_rowcol: tuple[int, int] = (-1, -1)
     """The 0-indexed `(row, column)` of the first caret visually. -1 if no caret."""
+    content_scanner: ContentScanner = field(default_factory=ContentScanner, repr=False)
+    """The scanner of content patterns. It's provided by the rule collection which tests this snapshot."""
+    content_scan_counts: dict[ScanKey, ScanCount] = field(default_factory=dict, repr=False)
+    """Counts of content patterns which have been scanned in this snapshot."""
+    literal_scanner: LiteralScanner = field(default_factory=LiteralScanner, repr=False)
+    """The scanner of literal needles. It's provided by the rule collection which tests this snapshot."""
+    literal_founds: dict[LiteralHaystack, frozenset[str]] = field(default_factory=dict, repr=False)
+    """Literal needles which have been found in attributes of this snapshot."""
+    constraint_memo: dict[Hashable, bool | Exception] = field(default_factory=dict, repr=False)
+    """Outcomes (before inversion) of constraints in this run, keyed by `ConstraintRule.memo_key`."""
+    constraint_results: dict[int, tuple[bool, SnapshotInput]] | None = field(default=None, repr=False)
+    """
+    Results of constraint rules (keyed by their `id()`) together with their inputs, for incremental detection.
+    Results in it are re-used and new results are recorded. `None` if not using incremental detection.
+    """
+
+    @cached_property
+    def content(self) -> str:
+        """Pseudo file content."""
+        if file_sample := self.file_sample:
+            return file_sample[0]
+        return get_view_pseudo_content(self.view, self.window)
+
+    @cached_property
+    def content_bytes(self) -> bytes:
+        """Pseudo file content in bytes. It's sampled from the file as-is if possible, like for Magika."""
+        if file_sample := self.file_sample:
+            return file_sample[1]
+        return self.content.encode()
+
+    @cached_property
+    def file_sample(self) -> tuple[str, bytes] | None:
+        """
+        `(content, raw_bytes)` sampled from the file by memory-mapping, which saves copying from the view.
+        `None` if the view is not a clean UTF-8 file on a disk.
+        """
+        if not (
+            (path := self.path_obj)
+            and not self.view.is_dirty()
+            and not self.view.is_loading()
+            and self.view.encoding() in {"UTF-8", "UTF-8 with BOM"}
+            and self.view.line_endings() in {"Unix", "Windows"}
+        ):
+            return None
+        try:
+            return get_file_pseudo_content(path, self.window, char_count=self.char_count)
+        except (OSError, ValueError):
+            return None
+
+    def count_in_content(self, key: ScanKey, limit: int) -> int:
+        """Counts non-overlapping matches of `key` in `content`. The result is capped by `limit` (at least)."""
+        return self.content_scanner.count(self.content, self.content_scan_counts, key, limit)
+
+    def contains_any_literal(self, haystack: LiteralHaystack, needles: Iterable[str]) -> bool:
+        """Tests whether any of `needles` is in the `haystack` attribute, like `file_name`."""
+        return self.literal_scanner.contains_any(getattr(self, haystack), self.literal_founds, haystack, needles)
+
+    @cached_property
+    def first_line(self) -> str:
+        """Pseudo first line."""
+        return get_view_pseudo_first_line(self.view, self.window)
+
+    @cached_property
+    def line_count(self) -> int:
+        """Number of lines in the original content."""
+        return self.view.rowcol(self.char_count)[0] + 1
+
+    @cached_property
+    def path_obj(self) -> Path | None:
+        """The path object of this file. `None` if not on a disk."""
+        # is real file on a disk?
+        if (_path := self.view.file_name()) and (path := Path(_path).resolve()).is_file():
+            return path
+        return None
 
     @property
     def file_extensions(self) -> list[str]:
         """The file extensions. Empty list if not on a disk."""
         return self.path_obj.suffixes if self.path_obj else []
 
-    @property
+    @cached_property
     def file_name(self) -> str:
         """The file name. Empty string if not on a disk."""
         return self.path_obj.name if self.path_obj else ""
@@ -43,12 +124,12 @@ class ViewSnapshot:
         """The file name without prefixed dots. Empty string if not on a disk."""
         return self.file_name.lstrip(".")
 
-    @property
+    @cached_property
     def file_path(self) -> str:
         """The full file path with `/` as the directory separator. Empty string if not on a disk."""
         return self.path_obj.as_posix() if self.path_obj else ""
 
-    @property
+    @cached_property
     def file_size(self) -> int:
         """The file size in bytes, -1 if file not on a disk."""
         return self.path_obj.stat().st_size if self.path_obj else -1
@@ -58,25 +139,21 @@ class ViewSnapshot:
         """The `view` object if it's still valid, otherwise `None`."""
         return self.view if self.view.is_valid() else None
 
+    def is_up_to_date(self) -> bool:
+        """Whether the view is still valid and has not been modified or changed syntax since the snapshot."""
+        return (
+            self.view.is_valid() and self.view.change_count() == self.change_count and self.view.syntax() == self.syntax
+        )
+
     @classmethod
     def from_view(cls, view: sublime.View) -> ViewSnapshot:
         """Create a `ViewSnapshot` object from a `sublime.View` object."""
-        window = view.window() or sublime.active_window()
-
-        # is real file on a disk?
-        if (_path := view.file_name()) and (path := Path(_path).resolve()).is_file():
-            pass
-        else:
-            path = None
-
         return cls(
             view=view,
+            window=view.window() or sublime.active_window(),
             char_count=view.size(),
-            content=get_view_pseudo_content(view, window),
-            first_line=get_view_pseudo_first_line(view, window),
-            line_count=view.rowcol(view.size())[0] + 1,
-            path_obj=path,
             syntax=view.syntax(),
+            change_count=view.change_count(),
             caret_rowcol=view.rowcol(sels[0].b) if len(sels := view.sel()) else (-1, -1),
         )
 
@@ -85,6 +162,12 @@ def get_view_pseudo_content(view: sublime.View, window: sublime.Window) -> str:
     return head_tail_content_st(view, get_merged_plugin_setting("trim_file_size", window=window))
 
 
+def get_file_pseudo_content(path: Path, window: sublime.Window, *, char_count: int) -> tuple[str, bytes]:
+    return head_tail_content_file(
+        path, get_merged_plugin_setting("trim_file_size", window=window), char_count=char_count
+    )
+
+
 def get_view_pseudo_first_line(view: sublime.View, window: sublime.Window) -> str:
     region = view.line(0)
     if (max_length := get_merged_plugin_setting("trim_first_line_length", window=window)) >= 0:
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections import UserDict
-from enum import Enum
+from dataclasses import dataclass
+from enum import Enum, Flag, IntEnum
 from typing import TYPE_CHECKING, Any, Generator, KeysView, TypedDict, TypeVar, Union
 
 import sublime
@@ -40,6 +41,44 @@ class ListenerEvent(Enum):
             return None
 
 
+class ConstraintCost(IntEnum):
+    """The rough cost class of testing a constraint. The cheaper one has a lower value."""
+
+    PURE_STRING = 0
+    """Only compares strings which are cheap to get, like the file name."""
+    CONTENT_SCAN = 1
+    """Scans the view content."""
+    FILESYSTEM = 2
+    """Accesses the filesystem."""
+    ML = 3
+    """Runs a machine learning model."""
+
+
+class SnapshotInput(Flag):
+    """Parts of a `ViewSnapshot` which a constraint's result depends on, apart from the file and the syntax."""
+
+    NONE = 0
+    CONTENT = 1
+    """The pseudo file content."""
+    FIRST_LINE = 2
+    """The pseudo first line."""
+    LINE_COUNT = 4
+    """The line count."""
+    UNKNOWN = 8
+    """Anything. A constraint depends on this is always re-tested."""
+
+    TEXT = CONTENT | FIRST_LINE | LINE_COUNT
+    ALL = TEXT | UNKNOWN
+
+
+@dataclass
+class SyntaxDecision:
+    """A syntax which is decided for a view, with details about why it's decided."""
+
+    syntax: sublime.Syntax
+    details: dict[str, Any]
+
+
 class Optimizable(ABC):
     def is_droppable(self) -> bool:
         """
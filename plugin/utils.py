@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import inspect
+import mmap
 import operator
 import os
 import re
@@ -9,22 +10,21 @@ import shutil
 import sys
 import tempfile
 import threading
+from array import array
 from collections.abc import Generator, Iterable
-from functools import cmp_to_key, lru_cache, reduce, wraps
-from itertools import islice
+from functools import cmp_to_key, lru_cache, reduce
+from itertools import count, islice
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Mapping, Pattern, Tuple, TypeVar, Union, cast, overload
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Pattern, Tuple, TypeVar, Union, overload
 
 import sublime
 
 from .cache import clearable_lru_cache
-from .libs.trie import TrieNode
 from .types import SyntaxLike
 
 _T = TypeVar("_T")
 _U = TypeVar("_U")
 
-_T_Callable = TypeVar("_T_Callable", bound=Callable[..., Any])
 _T_ExpandableVar = TypeVar("_T_ExpandableVar", bound=Union[None, bool, int, float, str, Dict, List, Tuple])
 
 
@@ -64,6 +64,18 @@ def compile_regex(regex: str | Pattern[str], flags: int = 0) -> Pattern[str]:
     return re.compile(regex, flags)
 
 
+def freeze(obj: Any) -> Hashable:
+    """Converts `obj`, which is JSON-like, into a hashable form. Raises `TypeError` if it's impossible."""
+    if isinstance(obj, (list, tuple)):
+        return tuple(map(freeze, obj))
+    if isinstance(obj, dict):
+        return tuple(sorted((key, freeze(value)) for key, value in obj.items()))
+    if isinstance(obj, (set, frozenset)):
+        return frozenset(map(freeze, obj))
+    hash(obj)
+    return obj
+
+
 def get_fqcn(obj: Any) -> str:
     if obj is None:
         return "None"
@@ -112,41 +124,93 @@ def parse_regex_flags(flags: Iterable[str]) -> int:
     return reduce(operator.ior, (getattr(re, flag, 0) for flag in flags), 0)
 
 
+class SuffixTrie:
+    """
+    A compact trie of reversed words, which finds words that are suffixes of a string.
+
+    Nodes are stored in flat arrays rather than one object per character. Edges of a node are
+    `chars[offsets[node]:offsets[node + 1]]`, sorted, and they lead to nodes in the same positions of `targets`.
+    """
+
+    __slots__ = ("chars", "offsets", "targets", "is_leaf")
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        nodes: list[dict[str, int]] = [{}]
+        leaves: set[int] = set()
+        for word in words:
+            node = 0
+            for char in reversed(word):
+                if (child := nodes[node].get(char)) is None:
+                    child = nodes[node][char] = len(nodes)
+                    nodes.append({})
+                node = child
+            if node:
+                leaves.add(node)
+
+        chars: list[str] = []
+        self.offsets = array("l", [0])
+        self.targets = array("l")
+        for edges in nodes:
+            for char in sorted(edges):
+                chars.append(char)
+                self.targets.append(edges[char])
+            self.offsets.append(len(chars))
+        self.chars = "".join(chars)
+        self.is_leaf = bytearray(node in leaves for node in range(len(nodes)))
+
+    def __len__(self) -> int:
+        """The amount of nodes, including the root."""
+        return len(self.is_leaf)
+
+    def find_suffix_starts(self, string: str, end: int | None = None) -> Generator[int, None, None]:
+        """Yields start offsets of words which are suffixes of `string[:end]`, from the shortest word."""
+        chars, offsets, targets, is_leaf = self.chars, self.offsets, self.targets, self.is_leaf
+        node = 0
+        for idx in range(len(string) if end is None else end, 0, -1):
+            if (edge := chars.find(string[idx - 1], offsets[node], offsets[node + 1])) == -1:
+                return
+            node = targets[edge]
+            if is_leaf[node]:
+                yield idx - 1
+
+
 @clearable_lru_cache()
-def build_reversed_trie(words: tuple[str]) -> TrieNode:
-    """Returns a trie with all words reversed. It can be used to match suffixes with reversed input string."""
-    trie = TrieNode()
-    for word in words:
-        trie.insert(word[::-1])
-    return trie
+def build_reversed_trie(words: tuple[str]) -> SuffixTrie:
+    """Returns a trie with all words reversed. It can be used to match suffixes of an input string."""
+    return SuffixTrie(words)
 
 
-def debounce(time_s: float = 0.3) -> Callable[[_T_Callable], _T_Callable]:
+class Debouncer:
     """
-    Debounce a function so that it's called after `time_s` seconds.
-    If it's called multiple times in the time frame, it will only run the last call.
+    Debounces calls per key. If there are multiple calls for a key in the time frame, only the last one runs.
 
-    Taken and modified from https://github.com/salesforce/decorator-operations
+    Calls are scheduled by `sublime.set_timeout_async` so no thread is created for them.
+    A superseded call is not cancelled in ST but it's skipped when it's due.
     """
 
-    def decorator(func: _T_Callable) -> _T_Callable:
-        @wraps(func)
-        def debounced(*args: Any, **kwargs: Any) -> None:
-            def call_function() -> Any:
-                delattr(debounced, "_timer")
-                return func(*args, **kwargs)
+    def __init__(self) -> None:
+        self._tokens: dict[Hashable, int] = {}
+        self._token_counter = count(1)
+        self._lock = threading.Lock()
 
-            if timer := getattr(debounced, "_timer", None):
-                timer.cancel()
+    def __len__(self) -> int:
+        """The amount of keys which have a pending call."""
+        with self._lock:
+            return len(self._tokens)
 
-            timer = threading.Timer(time_s, call_function)
-            timer.start()
-            setattr(debounced, "_timer", timer)
+    def call(self, key: Hashable, time_s: float, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Calls `func(*args, **kwargs)` after `time_s` seconds unless there is a newer call for `key`."""
+        with self._lock:
+            token = self._tokens[key] = next(self._token_counter)
 
-        setattr(debounced, "_timer", None)
-        return cast(_T_Callable, debounced)
+        def call_function() -> None:
+            with self._lock:
+                if self._tokens.get(key) != token:
+                    return
+                del self._tokens[key]
+            func(*args, **kwargs)
 
-    return decorator
+        sublime.set_timeout_async(call_function, int(time_s * 1000))
 
 
 @overload
@@ -368,6 +432,40 @@ def head_tail_content_st(view: sublime.View, partial: int) -> str:
     )
 
 
+def head_tail_content_file(path: Path, partial: int, *, char_count: int) -> tuple[str, bytes]:
+    """
+    Samples the head and the tail of a UTF-8 file by memory-mapping it, rather than copying them from a view.
+
+    Returns `(content, data)`. `content` equals what `head_tail_content_st()` returns for a clean view of this file,
+    which has `char_count` characters, so line endings are normalized to `\n`. `data` is the sampled raw bytes,
+    which are the whole file if it's small or otherwise the head and the tail, concatenated.
+    """
+    if (half := partial // 2) <= 0:
+        return ("", b"")
+
+    with path.open("rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return ("", b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # a character takes at most 4 bytes in UTF-8, and there may be a 3-byte BOM
+            if char_count <= partial or len(mm) <= (window := half * 4 + 3) * 2:
+                head = tail = data = mm[:]
+            else:
+                head, tail = mm[:window], mm[-window:]
+                data = head + tail
+
+    if (content := _decode_file_bytes(head)).startswith("\ufeff"):
+        content = content[1:]
+    if char_count <= partial:
+        return (content, data)
+    return (content[:half] + "\n\n" + _decode_file_bytes(tail)[-half:], data)
+
+
+def _decode_file_bytes(data: bytes) -> str:
+    # bytes of a character may be cut at boundaries, which are just ignored
+    return data.decode("utf-8", errors="ignore").replace("\r\n", "\n")
+
+
 def is_plaintext_syntax(syntax: sublime.Syntax) -> bool:
     """Determinates whether the syntax is plain text."""
     return get_syntax_name(syntax) == "Plain Text"
@@ -420,20 +518,27 @@ def list_trimmed_filenames(filename: str, skip_self: bool = False) -> Generator[
 def list_trimmed_strings(string: str, suffixes: tuple[str], skip_self: bool = False) -> Generator[str, None, None]:
     """Generates strings with suffixes trimmed."""
     trie = build_reversed_trie(suffixes)
+    ends: set[int] = set()
 
-    def dfs(string_rev: str) -> Generator[str, None, None]:
-        for prefix in trie.find_prefixes(string_rev):
-            yield (trimmed := string_rev[len(prefix) :])
-            yield from dfs(trimmed)
+    def dfs(end: int) -> Generator[int, None, None]:
+        for start in trie.find_suffix_starts(string, end):
+            # a visited end offset has had all its trimmed strings generated
+            if start not in ends:
+                ends.add(start)
+                yield start
+                yield from dfs(start)
 
     if not skip_self:
         yield string
 
-    results: set[str] = set()
-    for trimmed in dfs(string[::-1]):
-        if trimmed not in results:
-            results.add(trimmed)
-            yield trimmed[::-1]
+    for end in dfs(len(string)):
+        yield string[:end]
+
+
+@clearable_lru_cache()
+def trimmed_strings(string: str, suffixes: tuple[str], skip_self: bool = False) -> tuple[str, ...]:
+    """The cached version of `list_trimmed_strings()`, which is called by rules with the same file name repeatedly."""
+    return tuple(list_trimmed_strings(string, suffixes, skip_self))
 
 
 def str_finditer(content: str, substr: str) -> Generator[int, None, None]: